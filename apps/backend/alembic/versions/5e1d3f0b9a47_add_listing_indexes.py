@@ -0,0 +1,43 @@
+"""add_listing_indexes
+
+Revision ID: 5e1d3f0b9a47
+Revises: c2a2ff438ec6
+Create Date: 2026-10-18 10:12:31.508114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d3f0b9a47'
+down_revision: Union[str, Sequence[str], None] = 'c2a2ff438ec6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built without blocking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_website_categories_category_id', 'website_categories', ['category_id', 'website_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_website_styles_style_id', 'website_styles', ['style_id', 'website_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_website_collections_collection_id', 'website_collections', ['collection_id', 'website_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_websites_active_created', 'websites', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
+        op.create_index('ix_websites_active_popular', 'websites', ['view_count', 'id'], unique=False, postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
+        op.create_index('ix_websites_featured_created', 'websites', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_featured IS true AND is_active IS true'), postgresql_concurrently=True)
+        op.create_index('ix_websites_platform_id', 'websites', ['platform_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_websites_platform_id', table_name='websites', postgresql_concurrently=True)
+        op.drop_index('ix_websites_featured_created', table_name='websites', postgresql_where=sa.text('is_featured IS true AND is_active IS true'), postgresql_concurrently=True)
+        op.drop_index('ix_websites_active_popular', table_name='websites', postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
+        op.drop_index('ix_websites_active_created', table_name='websites', postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
+        op.drop_index('ix_website_collections_collection_id', table_name='website_collections', postgresql_concurrently=True)
+        op.drop_index('ix_website_styles_style_id', table_name='website_styles', postgresql_concurrently=True)
+        op.drop_index('ix_website_categories_category_id', table_name='website_categories', postgresql_concurrently=True)
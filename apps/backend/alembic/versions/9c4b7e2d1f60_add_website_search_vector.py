@@ -0,0 +1,34 @@
+"""add_website_search_vector
+
+Revision ID: 9c4b7e2d1f60
+Revises: 5e1d3f0b9a47
+Create Date: 2026-10-18 14:05:12.731940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4b7e2d1f60'
+down_revision: Union[str, Sequence[str], None] = '5e1d3f0b9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('websites', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+    # Built without blocking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_websites_search_vector', 'websites', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_websites_search_vector', table_name='websites', postgresql_using='gin', postgresql_concurrently=True)
+    op.drop_column('websites', 'search_vector')
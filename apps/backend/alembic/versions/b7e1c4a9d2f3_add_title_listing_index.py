@@ -0,0 +1,31 @@
+"""add_title_listing_index
+
+Revision ID: b7e1c4a9d2f3
+Revises: 9c4b7e2d1f60
+Create Date: 2026-10-18 16:41:03.215877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c4a9d2f3'
+down_revision: Union[str, Sequence[str], None] = '9c4b7e2d1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built without blocking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_websites_active_title', 'websites', ['title', 'id'], unique=False, postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_websites_active_title', table_name='websites', postgresql_where=sa.text('is_active IS true'), postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""reconcile_website_counts
+
+Revision ID: e4f8a2c6b1d9
+Revises: b7e1c4a9d2f3
+Create Date: 2026-10-18 18:12:37.508214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f8a2c6b1d9'
+down_revision: Union[str, Sequence[str], None] = 'b7e1c4a9d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Table -> (junction table, junction column), as in app.models.website_counts
+JUNCTIONS = {
+    'categories': ('website_categories', 'category_id'),
+    'styles': ('website_styles', 'style_id'),
+    'collections': ('website_collections', 'collection_id'),
+}
+
+
+def upgrade() -> None:
+    """Recompute every website_count from the active websites.
+
+    Listing totals now read these counters, but until now only the data
+    import set them, for categories alone and counting inactive websites.
+    """
+    for table, (junction, column) in JUNCTIONS.items():
+        op.execute(sa.text(
+            f"UPDATE {table} SET website_count = ("
+            f" SELECT count(*) FROM {junction}"
+            f" JOIN websites ON websites.id = {junction}.website_id"
+            f" WHERE {junction}.{column} = {table}.id AND websites.is_active IS true)"
+        ))
+    op.execute(sa.text(
+        "UPDATE platforms SET website_count = ("
+        " SELECT count(*) FROM websites"
+        " WHERE websites.platform_id = platforms.id AND websites.is_active IS true)"
+    ))
+
+
+def downgrade() -> None:
+    """Counters stay as reconciled; they are valid under either revision."""
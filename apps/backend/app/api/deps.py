@@ -1,17 +1,82 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_access_token
 from app.crud.user import crud_user
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
+from app.schemas.common import Cursor
+from app.schemas.website import WebsiteFilter
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 DB = Annotated[AsyncSession, Depends(get_db)]
+# Replica-routed session for GET endpoints; never write through it
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
+
+
+def get_cursor(
+    cursor: Annotated[
+        str | None, Query(description="Opaque keyset cursor; replaces page")
+    ] = None,
+) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+PageCursor = Annotated[Cursor | None, Depends(get_cursor)]
+
+
+def get_website_filter(
+    category: Annotated[list[str], Query(description="Category slug; repeat for several")] = [],
+    style: Annotated[list[str], Query(description="Style slug; repeat for several")] = [],
+    collection: Annotated[list[str], Query(description="Collection slug; repeat for several")] = [],
+    platform: Annotated[list[str], Query(description="Platform slug; repeat for several")] = [],
+    match: Annotated[
+        Literal["any", "all"],
+        Query(description="Whether several slugs of one taxonomy match any or all"),
+    ] = "any",
+    featured: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> WebsiteFilter:
+    # Sorted and deduplicated, so equivalent filters share cache keys
+    return WebsiteFilter(
+        category=sorted(set(category)),
+        style=sorted(set(style)),
+        collection=sorted(set(collection)),
+        platform=sorted(set(platform)),
+        match=match,
+        featured=featured,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+
+ListFilter = Annotated[WebsiteFilter, Depends(get_website_filter)]
+
+WithTotal = Annotated[
+    bool, Query(description="Set false to skip the exact total, e.g. for infinite scroll")
+]
+
+WithFacets = Annotated[
+    bool,
+    Query(
+        alias="facets",
+        description="Set true to include category, style, collection and platform counts",
+    ),
+]
 
 
 async def get_current_user(
@@ -0,0 +1,94 @@
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+
+from app.core.cache import CacheEntry, NegativeResult, cache_get_or_set
+from app.schemas.common import Facets
+
+facets_adapter = TypeAdapter(Facets)
+
+
+def json_body(adapter: TypeAdapter, value: Any) -> bytes:
+    """Validate ORM objects against the response schema and encode them once."""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def entry_response(request: Request, entry: CacheEntry) -> Response:
+    """Send a cached body as-is, or 304 when the client already has it.
+
+    Compressed bodies are passed through when the client accepts gzip; that
+    representation gets its own ETag. Cached negative results are replayed
+    with their original status.
+    """
+    if entry.status_code != status.HTTP_200_OK:
+        return Response(
+            entry.decompressed(),
+            status_code=entry.status_code,
+            media_type="application/json",
+        )
+
+    gzip_ok = entry.compressed and "gzip" in request.headers.get("accept-encoding", "")
+    etag = f'"{entry.etag}-gzip"' if gzip_ok else f'"{entry.etag}"'
+    headers = {"ETag": etag}
+    if entry.compressed:
+        headers["Vary"] = "Accept-Encoding"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if gzip_ok:
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.body, media_type="application/json", headers=headers)
+    return Response(entry.decompressed(), media_type="application/json", headers=headers)
+
+
+async def cached_response(
+    request: Request,
+    key: str,
+    loader: Callable[[], Awaitable[bytes]],
+    **options: Any,
+) -> Response:
+    """Read through the cache and return the body without touching Pydantic.
+
+    A 404 raised by the loader is cached briefly too, so unknown slugs stop
+    reaching the database. It is retired with the key's tags, e.g. when a
+    website is created under that slug.
+    """
+
+    async def load() -> bytes:
+        try:
+            return await loader()
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_404_NOT_FOUND:
+                raise
+            raise NegativeResult(json.dumps({"detail": exc.detail}).encode())
+
+    entry = await cache_get_or_set(key, load, **options)
+    return entry_response(request, entry)
+
+
+async def cached_facets(
+    key: str, loader: Callable[[], Awaitable[Any]], **options: Any
+) -> Facets:
+    """Facet counts for one filter set, cached apart from its pages.
+
+    Every page and page size of the same filters shares the entry.
+    """
+
+    async def load() -> bytes:
+        return json_body(facets_adapter, await loader())
+
+    entry = await cache_get_or_set(key, load, **options)
+    return facets_adapter.validate_json(entry.decompressed())
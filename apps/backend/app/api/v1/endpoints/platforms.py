@@ -1,16 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from pydantic import TypeAdapter
 
-from app.api.deps import DB
+from app.api.deps import ReadDB
+from app.api.responses import cached_response, json_body
+from app.core.config import settings
 from app.models.platform import Platform
 from app.schemas.platform import PlatformRead
 
 router = APIRouter(prefix="/platforms", tags=["platforms"])
 
+list_adapter = TypeAdapter(list[PlatformRead])
+
 
 @router.get("", response_model=list[PlatformRead])
-async def list_platforms(db: DB):
+async def list_platforms(request: Request, db: ReadDB):
     from app.crud.platform import crud_platform
 
-    return await crud_platform.get_multi(
-        db, limit=200, filters=[Platform.is_active.is_(True)]
+    async def load() -> bytes:
+        items = await crud_platform.get_multi(
+            db, limit=200, filters=[Platform.is_active.is_(True)]
+        )
+        return json_body(list_adapter, items)
+
+    return await cached_response(
+        request,
+        "platforms:list",
+        load,
+        expire=settings.cache_ttl_reference,
+        tags=["platforms"],
+        local_ttl=settings.cache_local_ttl,
     )
@@ -1,26 +1,76 @@
-import math
+from fastapi import APIRouter, Query, Request, Response
+from pydantic import TypeAdapter
 
-from fastapi import APIRouter, Query
-
-from app.api.deps import DB
+from app.api.deps import DB, ReadDB, WithFacets, WithTotal
+from app.api.responses import cached_facets, cached_response, json_body
+from app.core.cache import make_cache_key
+from app.core.config import settings
 from app.crud.website import crud_website
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import FacetedPage, page_count
+from app.schemas.search import Suggestions
 from app.schemas.website import WebsiteListItem
+from app.services.suggest import MAX_SUGGESTIONS, get_suggest_index
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+page_adapter = TypeAdapter(FacetedPage[WebsiteListItem])
+
 
-@router.get("", response_model=PaginatedResponse[WebsiteListItem])
+@router.get("", response_model=FacetedPage[WebsiteListItem])
 async def search_websites(
-    db: DB,
+    request: Request,
+    db: ReadDB,
     q: str = Query(..., min_length=1, max_length=200),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    with_total: WithTotal = True,
+    with_facets: WithFacets = False,
 ):
-    items, total = await crud_website.search(
-        db, q, offset=(page - 1) * size, limit=size
+    async def load_facets():
+        filters = await crud_website.search_filters(db, q)
+        return await crud_website.facet_counts(db, filters=filters)
+
+    async def load() -> bytes:
+        items, total = await crud_website.search(
+            db, q, offset=(page - 1) * size, limit=size, with_total=with_total
+        )
+        facets = None
+        if with_facets:
+            facets = await cached_facets(
+                make_cache_key("websites:search:facets", q=q.lower()),
+                load_facets,
+                expire=settings.cache_ttl_search,
+                tags=["websites"],
+            )
+        return json_body(page_adapter, FacetedPage(
+            items=items, total=total, page=page, size=size,
+            pages=page_count(total, size), facets=facets,
+        ))
+
+    key = make_cache_key(
+        "websites:search",
+        q=q.lower(),
+        page=page,
+        size=size,
+        with_total=with_total,
+        facets=with_facets,
     )
-    return PaginatedResponse(
-        items=items, total=total, page=page, size=size,
-        pages=math.ceil(total / size) if size else 0,
+    return await cached_response(
+        request, key, load, expire=settings.cache_ttl_search, tags=["websites"]
     )
+
+
+@router.get("/suggest", response_model=Suggestions)
+async def suggest(
+    db: DB,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=MAX_SUGGESTIONS),
+):
+    """Website titles and taxonomy names starting with ``q``, for typeahead.
+
+    Served from this worker's in-memory prefix index rather than the
+    response cache. The primary session is only used for the worker's
+    first build; later rebuilds run in the background.
+    """
+    index = await get_suggest_index(db)
+    return Response(index.suggest(q, limit).model_dump_json(), media_type="application/json")
@@ -1,40 +1,93 @@
-import math
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
 
-from fastapi import APIRouter, HTTPException, Query, status
-
-from app.api.deps import DB
+from app.api.deps import PageCursor, ReadDB, WithTotal
+from app.api.responses import cached_response, json_body
+from app.core.cache import make_cache_key
+from app.core.config import settings
 from app.crud.style import crud_style
 from app.crud.website import crud_website
 from app.models.style import Style
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import Cursor, PaginatedResponse, page_count
 from app.schemas.style import StyleRead
-from app.schemas.website import WebsiteListItem
+from app.schemas.website import TaxonomySort, WebsiteListItem
+from app.services.popular import popular_page
 
 router = APIRouter(prefix="/styles", tags=["styles"])
 
+list_adapter = TypeAdapter(list[StyleRead])
+page_adapter = TypeAdapter(PaginatedResponse[WebsiteListItem])
+
 
 @router.get("", response_model=list[StyleRead])
-async def list_styles(db: DB):
-    return await crud_style.get_multi(
-        db, limit=200, filters=[Style.is_active.is_(True)]
+async def list_styles(request: Request, db: ReadDB):
+    async def load() -> bytes:
+        items = await crud_style.get_multi(
+            db, limit=200, filters=[Style.is_active.is_(True)]
+        )
+        return json_body(list_adapter, items)
+
+    return await cached_response(
+        request,
+        "styles:list",
+        load,
+        expire=settings.cache_ttl_reference,
+        tags=["styles"],
+        local_ttl=settings.cache_local_ttl,
     )
 
 
 @router.get("/{slug}/websites", response_model=PaginatedResponse[WebsiteListItem])
 async def style_websites(
+    request: Request,
     slug: str,
-    db: DB,
+    db: ReadDB,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    sort: TaxonomySort = "newest",
+    cursor: PageCursor = None,
+    with_total: WithTotal = True,
 ):
-    style = await crud_style.get_by_slug(db, slug)
-    if style is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Style not found")
-    items = await crud_website.get_by_style(
-        db, style.id, offset=(page - 1) * size, limit=size
+    if cursor is not None and sort != "newest":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor paging requires sort=newest",
+        )
+
+    async def load() -> bytes:
+        style = await crud_style.get_by_slug(db, slug)
+        if style is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Style not found")
+        if sort == "popular":
+            items = await popular_page(
+                db, kind="style", value=style, offset=(page - 1) * size, limit=size
+            )
+        else:
+            items, _ = await crud_website.get_by_style(
+                db,
+                style.id,
+                offset=0 if cursor else (page - 1) * size,
+                limit=size,
+                after=cursor,
+                with_total=False,
+            )
+        # The maintained counter replaces a COUNT over the junction table
+        total = style.website_count if with_total else None
+        return json_body(page_adapter, PaginatedResponse(
+            items=items, total=total, page=page, size=size,
+            pages=page_count(total, size),
+            next_cursor=Cursor.after(items, size) if sort == "newest" else None,
+        ))
+
+    key = make_cache_key(
+        f"websites:style:{slug}",
+        page=page,
+        size=size,
+        sort=sort,
+        cursor=cursor.encode() if cursor else None,
+        with_total=with_total,
     )
-    total = await crud_website.count_by_style(db, style.id)
-    return PaginatedResponse(
-        items=items, total=total, page=page, size=size,
-        pages=math.ceil(total / size) if size else 0,
+    return await cached_response(
+        request, key, load, expire=settings.cache_ttl_taxonomy_websites,
+        tags=[f"style:{slug}"],
     )
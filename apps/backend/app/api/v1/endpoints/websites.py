@@ -1,89 +1,298 @@
-import math
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter, HTTPException, Query, status
-
-from app.api.deps import DB, AdminUser
-from app.core.cache import cache_delete_pattern
-from app.crud.base import CRUDBase
+from app.api.deps import (
+    DB,
+    AdminUser,
+    ListFilter,
+    PageCursor,
+    ReadDB,
+    WithFacets,
+    WithTotal,
+)
+from app.api.responses import cached_facets, cached_response, json_body
+from app.core.cache import invalidate_tags, make_cache_key
+from app.core.config import settings
+from app.crud.category import crud_category
+from app.crud.collection import crud_collection
+from app.crud.platform import crud_platform
+from app.crud.style import crud_style
 from app.crud.website import crud_website
-from app.models.category import Category
-from app.models.style import Style
+from app.database import run_in_read_session
 from app.models.website import Website
-from app.schemas.common import PaginatedResponse
-from app.schemas.website import WebsiteCreate, WebsiteListItem, WebsiteRead, WebsiteUpdate
+from app.schemas.common import Cursor, FacetedPage, Facets, page_count
+from app.schemas.website import (
+    WebsiteCreate,
+    WebsiteFilter,
+    WebsiteListItem,
+    WebsiteRead,
+    WebsiteSort,
+    WebsiteUpdate,
+)
+from app.services.bitmap_index import current_bitmap_index
+from app.services.popular import popular_page
+from app.services.trending import trending_page
+from app.services.view_counter import record_view
 
-crud_category = CRUDBase[Category](Category)
-crud_style = CRUDBase[Style](Style)
+# WebsiteFilter field -> the taxonomy CRUD whose website_count it can use
+COUNTED_FILTERS = {
+    "category": crud_category,
+    "style": crud_style,
+    "collection": crud_collection,
+    "platform": crud_platform,
+}
 
 router = APIRouter(prefix="/websites", tags=["websites"])
 
+page_adapter = TypeAdapter(FacetedPage[WebsiteListItem])
+list_adapter = TypeAdapter(list[WebsiteListItem])
+detail_adapter = TypeAdapter(WebsiteRead)
+
+
+def _cache_tags(website: Website) -> set[str]:
+    """Cache tags for every listing the website can appear in."""
+    tags = {"websites", f"website:{website.slug}"}
+    tags.update(f"category:{category.slug}" for category in website.categories)
+    tags.update(f"style:{style.slug}" for style in website.styles)
+    tags.update(f"collection:{collection.slug}" for collection in website.collections)
+    if website.platform is not None:
+        tags.add(f"platform:{website.platform.slug}")
+    # Reference lists show each taxonomy's website_count
+    for name in ("categories", "styles", "collections"):
+        if getattr(website, name):
+            tags.add(name)
+    if website.platform is not None:
+        tags.add("platforms")
+    return tags
+
+
+def _list_tags(website_filter: WebsiteFilter) -> list[str]:
+    """Tags a write to any website that can appear in the listing bumps."""
+    tags = [
+        f"{name}:{slug}"
+        for name in COUNTED_FILTERS
+        for slug in sorted(set(getattr(website_filter, name)))
+    ]
+    return tags or ["websites"]
+
+
+async def _maintained_total(db: AsyncSession, website_filter: WebsiteFilter) -> int | None:
+    """``website_count`` of the one taxonomy value the listing filters on.
+
+    None when the filter is anything else and needs counting.
+    """
+    given = website_filter.model_dump(exclude_defaults=True)
+    if len(given) != 1:
+        return None
+    [(name, slugs)] = given.items()
+    if name not in COUNTED_FILTERS or len(set(slugs)) != 1:
+        return None
+    taxonomy = await COUNTED_FILTERS[name].get_by_slug(db, slugs[0])
+    return taxonomy.website_count if taxonomy is not None else 0
+
+
+async def _list_websites(
+    db: AsyncSession,
+    website_filter: WebsiteFilter,
+    page: int,
+    size: int,
+    sort: WebsiteSort = "newest",
+    cursor: Cursor | None = None,
+    with_total: bool = True,
+    with_facets: bool = False,
+) -> FacetedPage[WebsiteListItem]:
+    # A cursor continues from its keyset position instead of skipping rows
+    offset = 0 if cursor else (page - 1) * size
+    # With the bitmap index, SQL only fetches the page's rows
+    index = current_bitmap_index()
+    if index is not None:
+        ids, total = index.page(
+            website_filter, sort=sort, offset=offset, limit=size, after=cursor
+        )
+        items = await crud_website.get_by_ids(db, ids)
+        if not with_total:
+            total = None
+    else:
+        total = await _maintained_total(db, website_filter) if with_total else None
+        items, counted = await crud_website.get_filtered(
+            db,
+            website_filter,
+            sort=sort,
+            offset=offset,
+            limit=size,
+            after=cursor,
+            with_total=with_total and total is None,
+        )
+        if total is None:
+            total = counted
+
+    facets = None
+    if with_facets and index is not None:
+        facets = Facets.model_validate(index.facets(website_filter))
+    elif with_facets:
+        facets = await cached_facets(
+            make_cache_key(
+                "websites:facets",
+                **website_filter.model_dump(mode="json", exclude_defaults=True),
+            ),
+            lambda: crud_website.facet_counts(
+                db, filters=crud_website.filter_clauses(website_filter)
+            ),
+            expire=settings.cache_ttl_website_list,
+            tags=_list_tags(website_filter),
+        )
+
+    return FacetedPage[WebsiteListItem](
+        items=items, total=total, page=page, size=size,
+        pages=page_count(total, size),
+        next_cursor=Cursor.after(items, size) if sort == "newest" else None,
+        facets=facets,
+    )
 
-@router.get("", response_model=PaginatedResponse[WebsiteListItem])
+
+@router.get("", response_model=FacetedPage[WebsiteListItem])
 async def list_websites(
-    db: DB,
+    request: Request,
+    db: ReadDB,
+    website_filter: ListFilter,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    category: str | None = None,
-    style: str | None = None,
+    sort: WebsiteSort = "newest",
+    cursor: PageCursor = None,
+    with_total: WithTotal = True,
+    with_facets: WithFacets = False,
 ):
-    offset = (page - 1) * size
-
-    # Filter by category if provided
-    if category:
-        cat = await crud_category.get_by_slug(db, category)
-        if cat is None:
-            return PaginatedResponse(items=[], total=0, page=page, size=size, pages=0)
-        items = await crud_website.get_by_category(db, cat.id, offset=offset, limit=size)
-        total = await crud_website.count_by_category(db, cat.id)
-        return PaginatedResponse(
-            items=items, total=total, page=page, size=size,
-            pages=math.ceil(total / size) if size else 0,
+    if cursor is not None and sort != "newest":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor paging requires sort=newest",
         )
 
-    # Filter by style if provided
-    if style:
-        st = await crud_style.get_by_slug(db, style)
-        if st is None:
-            return PaginatedResponse(items=[], total=0, page=page, size=size, pages=0)
-        items = await crud_website.get_by_style(db, st.id, offset=offset, limit=size)
-        total = await crud_website.count_by_style(db, st.id)
-        return PaginatedResponse(
-            items=items, total=total, page=page, size=size,
-            pages=math.ceil(total / size) if size else 0,
+    async def load() -> bytes:
+        result = await _list_websites(
+            db, website_filter, page, size, sort, cursor, with_total, with_facets
         )
+        return json_body(page_adapter, result)
 
-    # No filters - return all
-    filters = [Website.is_active.is_(True)]
-    items = await crud_website.get_multi(db, offset=offset, limit=size, filters=filters)
-    total = await crud_website.count(db, filters=filters)
-    return PaginatedResponse(
-        items=items, total=total, page=page, size=size,
-        pages=math.ceil(total / size) if size else 0,
+    key = make_cache_key(
+        "websites:list",
+        page=page,
+        size=size,
+        sort=sort,
+        cursor=cursor.encode() if cursor else None,
+        with_total=with_total,
+        facets=with_facets,
+        **website_filter.model_dump(mode="json", exclude_defaults=True),
     )
+    return await cached_response(
+        request,
+        key,
+        load,
+        expire=settings.cache_ttl_website_list,
+        tags=_list_tags(website_filter),
+    )
+
+
+async def _load_featured(db: AsyncSession, limit: int) -> bytes:
+    return json_body(list_adapter, await crud_website.get_featured(db, limit=limit))
 
 
 @router.get("/featured", response_model=list[WebsiteListItem])
-async def featured_websites(db: DB, limit: int = Query(20, ge=1, le=100)):
-    return await crud_website.get_featured(db, limit=limit)
+async def featured_websites(
+    request: Request, db: ReadDB, limit: int = Query(20, ge=1, le=100)
+):
+    return await cached_response(
+        request,
+        make_cache_key("websites:featured", limit=limit),
+        lambda: _load_featured(db, limit),
+        expire=settings.cache_ttl_featured,
+        tags=["websites"],
+        local_ttl=settings.cache_local_ttl,
+        soft_ttl=settings.cache_soft_ttl_featured,
+        refresh=lambda: run_in_read_session(_load_featured, limit),
+    )
+
+
+async def _load_latest(db: AsyncSession, limit: int) -> bytes:
+    return json_body(list_adapter, await crud_website.get_latest(db, limit=limit))
 
 
 @router.get("/latest", response_model=list[WebsiteListItem])
-async def latest_websites(db: DB, limit: int = Query(20, ge=1, le=100)):
-    return await crud_website.get_latest(db, limit=limit)
+async def latest_websites(
+    request: Request, db: ReadDB, limit: int = Query(20, ge=1, le=100)
+):
+    return await cached_response(
+        request,
+        make_cache_key("websites:latest", limit=limit),
+        lambda: _load_latest(db, limit),
+        expire=settings.cache_ttl_latest,
+        tags=["websites"],
+        local_ttl=settings.cache_local_ttl,
+        soft_ttl=settings.cache_soft_ttl_latest,
+        refresh=lambda: run_in_read_session(_load_latest, limit),
+    )
+
+
+async def _load_popular(db: AsyncSession, limit: int) -> bytes:
+    return json_body(list_adapter, await popular_page(db, limit=limit))
 
 
 @router.get("/popular", response_model=list[WebsiteListItem])
-async def popular_websites(db: DB, limit: int = Query(20, ge=1, le=100)):
-    return await crud_website.get_popular(db, limit=limit)
+async def popular_websites(
+    request: Request, db: ReadDB, limit: int = Query(20, ge=1, le=100)
+):
+    return await cached_response(
+        request,
+        make_cache_key("websites:popular", limit=limit),
+        lambda: _load_popular(db, limit),
+        expire=settings.cache_ttl_popular,
+        tags=["websites"],
+        local_ttl=settings.cache_local_ttl,
+        soft_ttl=settings.cache_soft_ttl_popular,
+        refresh=lambda: run_in_read_session(_load_popular, limit),
+    )
+
+
+async def _load_trending(db: AsyncSession, limit: int) -> bytes:
+    return json_body(list_adapter, await trending_page(db, limit=limit))
+
+
+@router.get("/trending", response_model=list[WebsiteListItem])
+async def trending_websites(
+    request: Request, db: ReadDB, limit: int = Query(20, ge=1, le=100)
+):
+    return await cached_response(
+        request,
+        make_cache_key("websites:trending", limit=limit),
+        lambda: _load_trending(db, limit),
+        expire=settings.cache_ttl_trending,
+        tags=["websites"],
+        local_ttl=settings.cache_local_ttl,
+        soft_ttl=settings.cache_soft_ttl_trending,
+        refresh=lambda: run_in_read_session(_load_trending, limit),
+    )
 
 
 @router.get("/{slug}", response_model=WebsiteRead)
-async def get_website(slug: str, db: DB):
-    website = await crud_website.get_by_slug(db, slug)
-    if website is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Website not found")
-    await crud_website.increment_view(db, website)
-    return website
+async def get_website(request: Request, slug: str, db: ReadDB):
+    async def load() -> bytes:
+        website = await crud_website.get_by_slug(db, slug)
+        if website is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Website not found")
+        return json_body(detail_adapter, website)
+
+    response = await cached_response(
+        request,
+        make_cache_key(f"websites:detail:{slug}"),
+        load,
+        expire=settings.cache_ttl_website_detail,
+        tags=[f"website:{slug}"],
+    )
+    # A revalidation answered 304 is still a view; a cached 404 is not
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        await record_view(slug)
+    return response
 
 
 @router.post("", response_model=WebsiteRead, status_code=status.HTTP_201_CREATED)
@@ -107,7 +316,10 @@ async def create_website(body: WebsiteCreate, db: DB, _admin: AdminUser):
         style_ids=body.style_ids,
         collection_ids=body.collection_ids,
     )
-    await cache_delete_pattern("websites:*")
+    tags = _cache_tags(website)
+    # Commit first: a read racing the bump must not cache pre-write rows
+    await db.commit()
+    await invalidate_tags(tags)
     return website
 
 
@@ -116,6 +328,7 @@ async def update_website(slug: str, body: WebsiteUpdate, db: DB, _admin: AdminUs
     website = await crud_website.get_by_slug(db, slug, include_inactive=True)
     if website is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Website not found")
+    stale_tags = _cache_tags(website)
     data = body.model_dump(exclude_unset=True)
     category_ids = data.pop("category_ids", None)
     style_ids = data.pop("style_ids", None)
@@ -128,7 +341,9 @@ async def update_website(slug: str, body: WebsiteUpdate, db: DB, _admin: AdminUs
         collection_ids=collection_ids,
         **data,
     )
-    await cache_delete_pattern("websites:*")
+    tags = stale_tags | _cache_tags(website)
+    await db.commit()
+    await invalidate_tags(tags)
     return website
 
 
@@ -137,5 +352,7 @@ async def delete_website(slug: str, db: DB, _admin: AdminUser):
     website = await crud_website.get_by_slug(db, slug, include_inactive=True)
     if website is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Website not found")
+    tags = _cache_tags(website)
     await crud_website.delete(db, website)
-    await cache_delete_pattern("websites:*")
+    await db.commit()
+    await invalidate_tags(tags)
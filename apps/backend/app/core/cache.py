@@ -1,19 +1,128 @@
-from typing import Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
 
 import redis.asyncio as redis
 
 from app.core.config import settings
 
+GENERATION_PREFIX = "cache:gen:"
+INVALIDATION_CHANNEL = "cache:invalidate"
+LOCK_PREFIX = "cache:lock:"
+
+# Deletes a lock only while it still holds the caller's token, in one step
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+logger = logging.getLogger(__name__)
+
 redis_client: Optional[redis.Redis] = None
 
 
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """An encoded response body, gzip-compressed when ``compressed``.
+
+    ``etag`` is a digest of the uncompressed body, computed once per fill.
+    """
+
+    body: bytes
+    etag: str
+    compressed: bool = False
+    fresh_until: float | None = None
+    status_code: int = 200
+
+    def decompressed(self) -> bytes:
+        return gzip.decompress(self.body) if self.compressed else self.body
+
+
+class NegativeResult(Exception):
+    """Raised by a loader to cache a short-lived negative (e.g. 404) body."""
+
+    def __init__(self, body: bytes, status_code: int = 404):
+        super().__init__(status_code)
+        self.body = body
+        self.status_code = status_code
+
+
+class LocalCache:
+    """Bounded per-process LRU with TTL, tagged for cross-worker invalidation."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any, frozenset[str]]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int, tags: Sequence[str] = ()) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value, frozenset(tags))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        stale = [key for key, entry in self._entries.items() if entry[2] & tags]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+local_cache = LocalCache(settings.cache_local_max_entries)
+
+# Cache fills currently running in this worker, keyed by Redis key
+_inflight: dict[str, asyncio.Future] = {}
+
+# Stale keys waiting for the background refresher; the queue only exists
+# while ``run_refresher`` is running
+_refresh_queue: Optional[asyncio.Queue] = None
+_refreshing: set[str] = set()
+
+# Called with the tags of every invalidation any worker publishes
+_invalidation_listeners: list[Callable[[list[str]], None]] = []
+
+
 async def get_redis() -> redis.Redis:
     global redis_client
     if redis_client is None:
         redis_client = redis.from_url(
             settings.redis_url,
-            encoding="utf-8",
-            decode_responses=True,
+            decode_responses=False,
         )
     return redis_client
 
@@ -25,13 +134,13 @@ async def close_redis() -> None:
         redis_client = None
 
 
-async def cache_get(key: str) -> Optional[str]:
+async def cache_get(key: str) -> Optional[bytes]:
     r = await get_redis()
     return await r.get(key)
 
 
 async def cache_set(
-    key: str, value: str, expire: int = settings.cache_expire_seconds
+    key: str, value: bytes | str, expire: int = settings.cache_expire_seconds
 ) -> None:
     r = await get_redis()
     await r.set(key, value, ex=expire)
@@ -42,7 +151,326 @@ async def cache_delete(key: str) -> None:
     await r.delete(key)
 
 
-async def cache_delete_pattern(pattern: str) -> None:
+def make_cache_key(namespace: str, **params: Any) -> str:
+    """Build a canonical key: params sorted by name, ``None`` values dropped."""
+    parts = [namespace]
+    parts.extend(
+        f"{name}={value}"
+        for name, value in sorted(params.items())
+        if value is not None
+    )
+    return ":".join(parts)
+
+
+async def get_generations(tags: Sequence[str]) -> list[int]:
+    r = await get_redis()
+    values = await r.mget([GENERATION_PREFIX + tag for tag in tags])
+    return [int(value or 0) for value in values]
+
+
+async def invalidate_tags(tags: Iterable[str]) -> None:
+    """Bump the generation of every tag so keys built from it stop matching.
+
+    Stale Redis entries are never deleted; they age out through their own
+    TTL. This worker's local copies and listeners are updated as soon as
+    the bump lands; other workers follow via the pub/sub channel.
+    """
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    r = await get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for tag in tags:
+            pipe.incr(GENERATION_PREFIX + tag)
+        pipe.publish(INVALIDATION_CHANNEL, json.dumps(tags))
+        await pipe.execute()
+    # Only once the bump landed: a read in between would still find the old
+    # generation and put the old entry straight back
+    _invalidate_locally(tags)
+
+
+def _invalidate_locally(tags: list[str]) -> None:
+    local_cache.invalidate(tags)
+    for callback in _invalidation_listeners:
+        callback(tags)
+
+
+def add_invalidation_listener(callback: Callable[[list[str]], None]) -> None:
+    _invalidation_listeners.append(callback)
+
+
+def remove_invalidation_listener(callback: Callable[[list[str]], None]) -> None:
+    _invalidation_listeners.remove(callback)
+
+
+async def listen_for_invalidations() -> None:
+    """Apply tag invalidations published by any worker to the local cache."""
+    while True:
+        try:
+            r = await get_redis()
+            async with r.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    _invalidate_locally(json.loads(message["data"]))
+        except redis.RedisError:
+            # Messages may have been missed while disconnected
+            local_cache.clear()
+            await asyncio.sleep(1)
+
+
+async def cache_get_or_set(
+    key: str,
+    loader: Callable[[], Awaitable[bytes]],
+    expire: int = settings.cache_expire_seconds,
+    *,
+    tags: Sequence[str] = (),
+    local_ttl: int | None = None,
+    soft_ttl: int | None = None,
+    refresh: Callable[[], Awaitable[bytes]] | None = None,
+) -> CacheEntry:
+    """Read-through helper: return the cached body or load and store it.
+
+    Loaders return the final encoded response body, so serialization is
+    paid once per fill rather than once per request.
+
+    When ``tags`` are given the key is suffixed with their current
+    generations, so ``invalidate_tags`` retires it in O(1). A ``local_ttl``
+    also keeps the entry in the in-process cache, skipping Redis entirely.
+
+    With ``soft_ttl`` the entry turns stale after that many seconds but is
+    still served until ``expire``; a stale hit queues ``refresh`` (a loader
+    that opens its own session) for the background refresher.
+
+    Redis errors never fail the request; the loader is used as a fallback.
+    """
+    if local_ttl:
+        entry = local_cache.get(key)
+        if entry is not None:
+            return entry
+
+    redis_key = key
+    try:
+        if tags:
+            generations = await get_generations(tags)
+            redis_key = f"{key}:gen={'.'.join(map(str, generations))}"
+        cached = await cache_get(redis_key)
+    except redis.RedisError:
+        return await _load_entry(loader, None)
+
+    if cached is not None:
+        entry = _decode(cached)
+        if (
+            refresh is not None
+            and entry.fresh_until is not None
+            and entry.fresh_until < time.time()
+        ):
+            schedule_refresh(redis_key, refresh, expire, soft_ttl)
+    else:
+        entry = await _load_once(redis_key, loader, expire, soft_ttl)
+
+    if local_ttl:
+        local_cache.set(key, entry, local_ttl, tags)
+    return entry
+
+
+def _make_entry(
+    body: bytes, soft_ttl: int | None, status_code: int = 200
+) -> CacheEntry:
+    fresh_until = time.time() + soft_ttl if soft_ttl else None
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    min_bytes = settings.cache_compress_min_bytes
+    if min_bytes and len(body) >= min_bytes:
+        body = gzip.compress(body, compresslevel=5)
+        return CacheEntry(body, etag, True, fresh_until, status_code)
+    return CacheEntry(body, etag, False, fresh_until, status_code)
+
+
+async def _load_entry(
+    loader: Callable[[], Awaitable[bytes]], soft_ttl: int | None
+) -> CacheEntry:
+    try:
+        return _make_entry(await loader(), soft_ttl)
+    except NegativeResult as negative:
+        return _make_entry(negative.body, None, negative.status_code)
+
+
+def _encode(entry: CacheEntry) -> bytes:
+    header = json.dumps({
+        "etag": entry.etag,
+        "fresh_until": entry.fresh_until,
+        "compressed": entry.compressed,
+        "status": entry.status_code,
+    })
+    return header.encode() + b"\n" + entry.body
+
+
+def _decode(cached: bytes) -> CacheEntry:
+    header, body = cached.split(b"\n", 1)
+    meta = json.loads(header)
+    return CacheEntry(
+        body, meta["etag"], meta["compressed"], meta["fresh_until"], meta["status"]
+    )
+
+
+async def _store(key: str, entry: CacheEntry, expire: int) -> None:
+    if entry.status_code != 200:
+        expire = min(expire, settings.cache_negative_ttl)
+    try:
+        await cache_set(key, _encode(entry), expire=expire)
+    except redis.RedisError:
+        pass
+
+
+async def _load_once(
+    key: str,
+    loader: Callable[[], Awaitable[bytes]],
+    expire: int,
+    soft_ttl: int | None,
+) -> CacheEntry:
+    """Coalesce concurrent misses for ``key`` into a single loader call.
+
+    Requests in this worker await the leader's future; other workers are
+    held back by the Redis fill lock taken in ``_fill``.
+    """
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The leading request went away before finishing; take over
+            return await _load_once(key, loader, expire, soft_ttl)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        entry = await _fill(key, loader, expire, soft_ttl)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark as retrieved so a failure nobody waited on is not logged
+        future.exception()
+        raise
+    else:
+        future.set_result(entry)
+        return entry
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _fill(
+    key: str,
+    loader: Callable[[], Awaitable[bytes]],
+    expire: int,
+    soft_ttl: int | None,
+) -> CacheEntry:
+    lock_key = LOCK_PREFIX + key
+    token = secrets.token_hex(8)
+    acquired = False
+    try:
+        try:
+            acquired = await _acquire_lock(lock_key, token)
+            # Another worker may have filled the key while we were missing it
+            cached = await cache_get(key) if acquired else await _wait_for_fill(key)
+            if cached is not None:
+                return _decode(cached)
+        except redis.RedisError:
+            pass
+
+        entry = await _load_entry(loader, soft_ttl)
+        await _store(key, entry, expire)
+        return entry
+    finally:
+        if acquired:
+            await _release_lock(lock_key, token)
+
+
+async def _wait_for_fill(key: str) -> Optional[bytes]:
+    """Poll for a value another worker is computing, up to the wait budget."""
+    deadline = time.monotonic() + settings.cache_lock_wait_ms / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.cache_lock_poll_ms / 1000)
+        cached = await cache_get(key)
+        if cached is not None:
+            return cached
+    return None
+
+
+async def _acquire_lock(lock_key: str, token: str) -> bool:
     r = await get_redis()
-    async for key in r.scan_iter(match=pattern):
-        await r.delete(key)
+    return bool(await r.set(
+        lock_key, token, nx=True, px=settings.cache_lock_timeout_ms
+    ))
+
+
+async def release_lock(r: redis.Redis, lock_key: str, token: str) -> bool:
+    """Release a lock taken with ``token``; False if it expired meanwhile.
+
+    A GET then DEL could delete a lock another worker took after ours
+    expired, so the check and the delete run as one script.
+    """
+    return bool(await r.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token))
+
+
+async def _release_lock(lock_key: str, token: str) -> None:
+    try:
+        r = await get_redis()
+        await release_lock(r, lock_key, token)
+    except redis.RedisError:
+        pass
+
+
+def schedule_refresh(
+    key: str,
+    refresh: Callable[[], Awaitable[bytes]],
+    expire: int,
+    soft_ttl: int | None,
+) -> None:
+    """Queue a stale key for the background refresher, once per worker."""
+    if _refresh_queue is None or key in _refreshing:
+        return
+    try:
+        _refresh_queue.put_nowait((key, refresh, expire, soft_ttl))
+    except asyncio.QueueFull:
+        return
+    _refreshing.add(key)
+
+
+async def run_refresher() -> None:
+    """Refresh stale entries one at a time; runs for the app's lifetime."""
+    global _refresh_queue
+    _refresh_queue = asyncio.Queue(maxsize=settings.cache_refresh_queue_size)
+    try:
+        while True:
+            key, refresh, expire, soft_ttl = await _refresh_queue.get()
+            try:
+                await _refresh(key, refresh, expire, soft_ttl)
+            except Exception:
+                logger.exception("Background refresh failed for %s", key)
+            finally:
+                _refreshing.discard(key)
+    finally:
+        _refresh_queue = None
+        _refreshing.clear()
+
+
+async def _refresh(
+    key: str,
+    refresh: Callable[[], Awaitable[bytes]],
+    expire: int,
+    soft_ttl: int | None,
+) -> None:
+    lock_key = LOCK_PREFIX + key
+    token = secrets.token_hex(8)
+    # Another worker holding the lock is already refreshing this key
+    if not await _acquire_lock(lock_key, token):
+        return
+    try:
+        await _store(key, await _load_entry(refresh, soft_ttl), expire)
+    finally:
+        await _release_lock(lock_key, token)
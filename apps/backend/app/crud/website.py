@@ -1,6 +1,24 @@
+from collections.abc import Iterable
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    String,
+    bindparam,
+    column,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -8,15 +26,84 @@ from app.crud.base import CRUDBase
 from app.models import (
     Category,
     Collection,
+    Platform,
     Style,
     Website,
     website_categories,
     website_collections,
     website_styles,
 )
+from app.models.website import SEARCH_CONFIG
+from app.schemas.website import WebsiteFilter, WebsiteSort
+
+
+# Exactly the columns WebsiteListItem renders
+LIST_COLUMNS = (
+    Website.id,
+    Website.slug,
+    Website.title,
+    Website.description,
+    Website.original_url,
+    Website.thumbnail_url,
+    Website.image_url,
+    Website.is_featured,
+    Website.view_count,
+    Website.created_at,
+)
+
+# Shorter queries are mostly prefixes; only trigram matching finds those
+MIN_FULLTEXT_LENGTH = 3
+
+# Facet name -> (taxonomy, junction table, junction column)
+FACETS = {
+    "categories": (Category, website_categories, "category_id"),
+    "styles": (Style, website_styles, "style_id"),
+    "collections": (Collection, website_collections, "collection_id"),
+}
+
+# WebsiteFilter field -> the same, for membership tests
+MEMBERSHIP_FILTERS = {
+    "category": FACETS["categories"],
+    "style": FACETS["styles"],
+    "collection": FACETS["collections"],
+}
+
+# Orderings other than newest-first; ``id`` keeps each one total
+SORT_ORDERS = {
+    "popular": (Website.view_count.desc(), Website.id.desc()),
+    "alpha": (Website.title.asc(), Website.id.asc()),
+}
+
+
+def _tsquery(query: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+
+def _fulltext_match(query: str):
+    return Website.search_vector.bool_op("@@")(_tsquery(query))
+
+
+def _trigram_match(query: str):
+    # True when a word in the title is similar to the query
+    # (pg_trgm.word_similarity_threshold); served by ix_websites_fulltext
+    return Website.title.bool_op("%>")(query)
+
+
+def _substring_match(query: str):
+    pattern = f"%{query}%"
+    return or_(Website.title.ilike(pattern), Website.description.ilike(pattern))
 
 
 class CRUDWebsite(CRUDBase[Website]):
+    """Listing methods return plain rows of ``LIST_COLUMNS``.
+
+    Only single-website reads and writes go through ``_base_query`` and load
+    the full relationship graph that ``WebsiteRead`` needs.
+    """
+
+    def _list_query(self) -> Select:
+        return select(*LIST_COLUMNS)
+
     def _base_query(self):
         return select(Website).options(
             selectinload(Website.categories),
@@ -25,6 +112,18 @@ class CRUDWebsite(CRUDBase[Website]):
             selectinload(Website.platform),
         )
 
+    def _newest_first(
+        self, stmt: Select, after: tuple[datetime, int] | None
+    ) -> Select:
+        """Order newest-first, continuing after a keyset position if given.
+
+        ``id`` breaks ties so rows sharing a ``created_at`` are neither
+        skipped nor repeated across pages.
+        """
+        if after is not None:
+            stmt = stmt.where(tuple_(Website.created_at, Website.id) < tuple(after))
+        return stmt.order_by(Website.created_at.desc(), Website.id.desc())
+
     async def get_by_slug(
         self, db: AsyncSession, slug: str, *, include_inactive: bool = False
     ) -> Website | None:
@@ -34,6 +133,134 @@ class CRUDWebsite(CRUDBase[Website]):
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def _page(
+        self,
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        offset: int,
+        limit: int,
+        after: tuple[datetime, int] | None,
+        with_total: bool,
+        order_by: tuple[Any, ...] | None = None,
+        window_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
+        """Fetch a page and, unless skipped, its total.
+
+        Pages are newest-first unless ``order_by`` is given (offset paging
+        only). With ``window_total`` the total rides along as
+        ``COUNT(*) OVER ()``, saving a statement, but the database then
+        reads every matching row before LIMIT; that only pays off on narrow
+        sets. Broad sets, pages past the end and pages after a cursor run
+        a separate COUNT instead.
+        """
+        if order_by is not None:
+            page = stmt.order_by(*order_by)
+        else:
+            page = self._newest_first(stmt, after)
+        in_window = with_total and window_total and after is None
+        if in_window:
+            page = page.add_columns(func.count().over().label("total"))
+        result = await db.execute(page.offset(offset).limit(limit))
+        rows = list(result.all())
+        if not with_total:
+            return rows, None
+        if in_window and rows:
+            return rows, rows[0].total
+        total = await db.scalar(select(func.count()).select_from(stmt.subquery()))
+        return rows, total
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        filters: list[Any],
+        offset: int = 0,
+        limit: int = 20,
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
+        stmt = self._list_query().where(*filters)
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=after, with_total=with_total
+        )
+
+    def filter_clauses(self, website_filter: WebsiteFilter) -> list[Any]:
+        """WHERE clauses selecting the active websites ``website_filter`` allows.
+
+        Each taxonomy test is a correlated EXISTS probing the junction
+        table's primary key; ``match="all"`` adds one EXISTS per slug.
+        """
+        clauses = [Website.is_active.is_(True)]
+        for name, (model, junction, column) in MEMBERSHIP_FILTERS.items():
+            slugs = sorted(set(getattr(website_filter, name)))
+            if not slugs:
+                continue
+            member = exists().where(
+                junction.c.website_id == Website.id, junction.c[column] == model.id
+            )
+            if website_filter.match == "all":
+                clauses.extend(member.where(model.slug == slug) for slug in slugs)
+            else:
+                clauses.append(member.where(model.slug.in_(slugs)))
+        if website_filter.platform:
+            clauses.append(
+                Website.platform_id.in_(
+                    select(Platform.id).where(Platform.slug.in_(website_filter.platform))
+                )
+            )
+        if website_filter.featured is not None:
+            clauses.append(Website.is_featured.is_(website_filter.featured))
+        if website_filter.created_after is not None:
+            clauses.append(Website.created_at >= website_filter.created_after)
+        if website_filter.created_before is not None:
+            clauses.append(Website.created_at < website_filter.created_before)
+        return clauses
+
+    async def get_filtered(
+        self,
+        db: AsyncSession,
+        website_filter: WebsiteFilter,
+        *,
+        sort: WebsiteSort = "newest",
+        offset: int = 0,
+        limit: int = 20,
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
+        """A page of websites matching ``website_filter``, in one statement.
+
+        Keyset paging with ``after`` only applies to ``sort="newest"``.
+        The total shares the page's statement only when a taxonomy or
+        ``featured=true`` narrows the set; otherwise it is counted apart.
+        """
+        stmt = self._list_query().where(*self.filter_clauses(website_filter))
+        narrow = website_filter.featured is True or any(
+            getattr(website_filter, name) for name in (*MEMBERSHIP_FILTERS, "platform")
+        )
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=after,
+            with_total=with_total, order_by=SORT_ORDERS.get(sort), window_total=narrow,
+        )
+
+    async def get_ids_by_slug(
+        self, db: AsyncSession, slugs: Iterable[str]
+    ) -> dict[str, int]:
+        result = await db.execute(
+            select(Website.slug, Website.id).where(Website.slug.in_(list(slugs)))
+        )
+        return dict(result.all())
+
+    async def get_by_ids(self, db: AsyncSession, ids: list[int]) -> list[Row]:
+        """List rows of the active websites ``ids``, in the order given."""
+        if not ids:
+            return []
+        result = await db.execute(
+            self._list_query().where(Website.id.in_(ids), Website.is_active.is_(True))
+        )
+        rows = {row.id: row for row in result}
+        return [rows[id] for id in ids if id in rows]
+
     async def get_multi(
         self,
         db: AsyncSession,
@@ -42,18 +269,19 @@ class CRUDWebsite(CRUDBase[Website]):
         limit: int = 20,
         filters: list[Any] | None = None,
         order_by: Any = None,
-    ) -> list[Website]:
-        stmt = self._base_query()
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Row]:
+        stmt = self._list_query()
         if filters:
             for f in filters:
                 stmt = stmt.where(f)
         if order_by is not None:
             stmt = stmt.order_by(order_by)
         else:
-            stmt = stmt.order_by(Website.created_at.desc())
+            stmt = self._newest_first(stmt, after)
         stmt = stmt.offset(offset).limit(limit)
         result = await db.execute(stmt)
-        return list(result.scalars().unique().all())
+        return list(result.all())
 
     async def count(
         self, db: AsyncSession, *, filters: list[Any] | None = None
@@ -67,7 +295,7 @@ class CRUDWebsite(CRUDBase[Website]):
 
     async def get_featured(
         self, db: AsyncSession, *, limit: int = 20
-    ) -> list[Website]:
+    ) -> list[Row]:
         return await self.get_multi(
             db,
             limit=limit,
@@ -76,7 +304,7 @@ class CRUDWebsite(CRUDBase[Website]):
 
     async def get_latest(
         self, db: AsyncSession, *, limit: int = 20
-    ) -> list[Website]:
+    ) -> list[Row]:
         return await self.get_multi(
             db,
             limit=limit,
@@ -85,14 +313,15 @@ class CRUDWebsite(CRUDBase[Website]):
         )
 
     async def get_popular(
-        self, db: AsyncSession, *, limit: int = 20
-    ) -> list[Website]:
-        return await self.get_multi(
-            db,
-            limit=limit,
-            filters=[Website.is_active.is_(True)],
-            order_by=Website.view_count.desc(),
+        self, db: AsyncSession, *, offset: int = 0, limit: int = 20
+    ) -> list[Row]:
+        stmt = (
+            self._list_query()
+            .where(Website.is_active.is_(True))
+            .order_by(*SORT_ORDERS["popular"])
         )
+        result = await db.execute(stmt.offset(offset).limit(limit))
+        return list(result.all())
 
     async def get_by_category(
         self,
@@ -101,32 +330,20 @@ class CRUDWebsite(CRUDBase[Website]):
         *,
         offset: int = 0,
         limit: int = 20,
-    ) -> list[Website]:
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
         stmt = (
-            self._base_query()
+            self._list_query()
             .join(website_categories)
             .where(
                 website_categories.c.category_id == category_id,
                 Website.is_active.is_(True),
             )
-            .order_by(Website.created_at.desc())
-            .offset(offset)
-            .limit(limit)
         )
-        result = await db.execute(stmt)
-        return list(result.scalars().unique().all())
-
-    async def count_by_category(self, db: AsyncSession, category_id: int) -> int:
-        stmt = (
-            select(func.count(Website.id))
-            .join(website_categories)
-            .where(
-                website_categories.c.category_id == category_id,
-                Website.is_active.is_(True),
-            )
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=after, with_total=with_total
         )
-        result = await db.execute(stmt)
-        return result.scalar_one()
 
     async def get_by_style(
         self,
@@ -135,32 +352,20 @@ class CRUDWebsite(CRUDBase[Website]):
         *,
         offset: int = 0,
         limit: int = 20,
-    ) -> list[Website]:
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
         stmt = (
-            self._base_query()
+            self._list_query()
             .join(website_styles)
             .where(
                 website_styles.c.style_id == style_id,
                 Website.is_active.is_(True),
             )
-            .order_by(Website.created_at.desc())
-            .offset(offset)
-            .limit(limit)
         )
-        result = await db.execute(stmt)
-        return list(result.scalars().unique().all())
-
-    async def count_by_style(self, db: AsyncSession, style_id: int) -> int:
-        stmt = (
-            select(func.count(Website.id))
-            .join(website_styles)
-            .where(
-                website_styles.c.style_id == style_id,
-                Website.is_active.is_(True),
-            )
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=after, with_total=with_total
         )
-        result = await db.execute(stmt)
-        return result.scalar_one()
 
     async def get_by_collection(
         self,
@@ -169,32 +374,20 @@ class CRUDWebsite(CRUDBase[Website]):
         *,
         offset: int = 0,
         limit: int = 20,
-    ) -> list[Website]:
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
         stmt = (
-            self._base_query()
+            self._list_query()
             .join(website_collections)
             .where(
                 website_collections.c.collection_id == collection_id,
                 Website.is_active.is_(True),
             )
-            .order_by(Website.created_at.desc())
-            .offset(offset)
-            .limit(limit)
         )
-        result = await db.execute(stmt)
-        return list(result.scalars().unique().all())
-
-    async def count_by_collection(self, db: AsyncSession, collection_id: int) -> int:
-        stmt = (
-            select(func.count(Website.id))
-            .join(website_collections)
-            .where(
-                website_collections.c.collection_id == collection_id,
-                Website.is_active.is_(True),
-            )
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=after, with_total=with_total
         )
-        result = await db.execute(stmt)
-        return result.scalar_one()
 
     async def search(
         self,
@@ -203,21 +396,134 @@ class CRUDWebsite(CRUDBase[Website]):
         *,
         offset: int = 0,
         limit: int = 20,
-    ) -> tuple[list[Website], int]:
-        pattern = f"%{query}%"
-        search_filter = or_(
-            Website.title.ilike(pattern),
-            Website.description.ilike(pattern),
-        )
-        filters = [search_filter, Website.is_active.is_(True)]
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None]:
+        """Active websites matching ``query``, most relevant first.
+
+        On PostgreSQL the query is parsed with ``websearch_to_tsquery`` and
+        matched against the GIN-indexed ``search_vector``, ranked by
+        ``ts_rank``. Short queries, and ones full-text search finds nothing
+        for (partial words, typos), fall back to trigram similarity on the
+        title. Other dialects use a substring match, newest first.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return await self.get_page(
+                db,
+                filters=[_substring_match(query), Website.is_active.is_(True)],
+                offset=offset,
+                limit=limit,
+                with_total=with_total,
+            )
 
-        items = await self.get_multi(db, offset=offset, limit=limit, filters=filters)
-        total = await self.count(db, filters=filters)
-        return items, total
+        if len(query.strip()) >= MIN_FULLTEXT_LENGTH:
+            stmt = self._list_query().where(
+                _fulltext_match(query), Website.is_active.is_(True)
+            )
+            rank = func.ts_rank(Website.search_vector, _tsquery(query))
+            rows, total = await self._page(
+                db, stmt, offset=offset, limit=limit, after=None,
+                with_total=with_total, order_by=(rank.desc(), Website.id.desc()),
+            )
+            if rows or total or (offset and await db.scalar(select(stmt.exists()))):
+                return rows, total
 
-    async def increment_view(self, db: AsyncSession, website: Website) -> None:
-        website.view_count += 1
-        await db.flush()
+        stmt = self._list_query().where(
+            _trigram_match(query), Website.is_active.is_(True)
+        )
+        similarity = func.word_similarity(query, Website.title)
+        return await self._page(
+            db, stmt, offset=offset, limit=limit, after=None,
+            with_total=with_total, order_by=(similarity.desc(), Website.id.desc()),
+        )
+
+    async def search_filters(self, db: AsyncSession, query: str) -> list[Any]:
+        """The filters ``search`` applies for ``query``, e.g. for facets."""
+        if db.get_bind().dialect.name != "postgresql":
+            return [_substring_match(query), Website.is_active.is_(True)]
+        if len(query.strip()) >= MIN_FULLTEXT_LENGTH:
+            filters = [_fulltext_match(query), Website.is_active.is_(True)]
+            if await db.scalar(select(exists().where(*filters))):
+                return filters
+        return [_trigram_match(query), Website.is_active.is_(True)]
+
+    async def facet_counts(
+        self, db: AsyncSession, *, filters: list[Any]
+    ) -> dict[str, list[Row]]:
+        """Count websites matching ``filters`` per category, style, collection and platform.
+
+        The filters run once, into a CTE of matching ids; one UNION ALL
+        groups it against each junction table (and ``platform_id``). Each
+        facet is ordered by count, then title.
+        """
+        matched = (
+            select(Website.id, Website.platform_id).where(*filters).cte("matched")
+        )
+        branches = [
+            select(
+                literal(name).label("facet"),
+                model.slug,
+                model.title,
+                func.count().label("count"),
+            )
+            .select_from(matched)
+            .join(junction, junction.c.website_id == matched.c.id)
+            .join(model, model.id == junction.c[column])
+            .where(model.is_active.is_(True))
+            .group_by(model.id)
+            for name, (model, junction, column) in FACETS.items()
+        ]
+        branches.append(
+            select(
+                literal("platforms").label("facet"),
+                Platform.slug,
+                Platform.title,
+                func.count().label("count"),
+            )
+            .select_from(matched)
+            .join(Platform, Platform.id == matched.c.platform_id)
+            .where(Platform.is_active.is_(True))
+            .group_by(Platform.id)
+        )
+        result = await db.execute(union_all(*branches))
+
+        facets: dict[str, list[Row]] = {name: [] for name in (*FACETS, "platforms")}
+        for row in result:
+            facets[row.facet].append(row)
+        for rows in facets.values():
+            rows.sort(key=lambda row: (-row.count, row.title))
+        return facets
+
+    async def add_views(self, db: AsyncSession, views: dict[str, int]) -> None:
+        """Add buffered view counts, keyed by slug, in a single statement.
+
+        ``updated_at`` is left alone; a view is not an edit.
+        """
+        if not views:
+            return
+        table = Website.__table__
+        if db.get_bind().dialect.name == "postgresql":
+            pending = values(
+                column("slug", String), column("views", Integer), name="pending"
+            ).data(list(views.items()))
+            await db.execute(
+                update(table)
+                .where(table.c.slug == pending.c.slug)
+                .values(
+                    view_count=table.c.view_count + pending.c.views,
+                    updated_at=table.c.updated_at,
+                )
+            )
+            return
+        # Other dialects cannot alias VALUES columns; use one executemany
+        await db.execute(
+            update(table)
+            .where(table.c.slug == bindparam("b_slug"))
+            .values(
+                view_count=table.c.view_count + bindparam("b_views"),
+                updated_at=table.c.updated_at,
+            ),
+            [{"b_slug": slug, "b_views": count} for slug, count in views.items()],
+        )
 
     async def create_with_relations(
         self,
@@ -296,6 +602,8 @@ class CRUDWebsite(CRUDBase[Website]):
             website.collections = cols
 
         await db.flush()
+        # A new platform_id leaves the loaded ``platform`` pointing at the old row
+        db.expire(website, ["platform"])
 
         # Reload with all relationships eagerly loaded
         result = await db.execute(
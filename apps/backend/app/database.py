@@ -1,14 +1,176 @@
-from collections.abc import AsyncGenerator
+import itertools
+import logging
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any, TypeVar
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core.cache import add_invalidation_listener
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict[str, Any]:
+        capacity = self.size() + self._max_overflow
+        checked_out = self.checkedout()
+        return {
+            "size": self.size(),
+            "capacity": capacity,
+            "checked_out": checked_out,
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "utilization": round(checked_out / capacity, 4) if capacity else 0.0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": (
+                round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0
+            ),
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+        }
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Pool and server tuning from settings for an engine on ``url``."""
+    options: dict[str, Any] = {
+        "echo": settings.db_echo,
+        "poolclass": MeteredPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)},
+        }
+    return options
+
+
+def build_engine(url: str) -> AsyncEngine:
+    return create_async_engine(url, **engine_options(url))
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    if isinstance(pool, MeteredPool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+class ReplicaRouter:
+    """Round-robin reads across replicas, skipping ones that recently failed.
+
+    A replica that refuses a connection is benched for
+    ``db_replica_retry_seconds``; with every replica benched (or none
+    configured) reads go to the primary. After a write, ``pin_to_primary``
+    keeps reads on the primary until the replicas have caught up.
+    """
+
+    def __init__(
+        self, primary: AsyncEngine, replicas: list[AsyncEngine], retry_after: float
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._pinned_until = 0.0
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._down_until.get(engine, 0.0) <= time.monotonic()
+
+    def pin_to_primary(self, seconds: float) -> None:
+        """Send every read to the primary for the next ``seconds``."""
+        self._pinned_until = max(self._pinned_until, time.monotonic() + seconds)
+
+    def candidates(self) -> list[AsyncEngine]:
+        if time.monotonic() < self._pinned_until:
+            return [self.primary]
+        start = next(self._turn)
+        count = len(self.replicas)
+        rotation = [self.replicas[(start + i) % count] for i in range(count)]
+        return [e for e in rotation if self.is_healthy(e)] + [self.primary]
+
+    async def connect(self) -> AsyncConnection:
+        for engine in self.candidates():
+            if engine is self.primary:
+                return await engine.connect()
+            try:
+                return await engine.connect()
+            except (OSError, exc.DBAPIError):
+                self._down_until[engine] = time.monotonic() + self.retry_after
+                logger.warning(
+                    "Read replica %s unavailable; benched for %.0fs",
+                    engine.url.render_as_string(hide_password=True),
+                    self.retry_after,
+                )
+        raise AssertionError("candidates() always ends with the primary")
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {"healthy": self.is_healthy(engine), **pool_stats(engine)}
+            for engine in self.replicas
+        ]
+
+
+engine = build_engine(settings.database_url)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_router = ReplicaRouter(
+    engine,
+    [build_engine(url) for url in settings.database_read_urls_list],
+    settings.db_replica_retry_seconds,
+)
+
+
+def _pin_after_write(tags: list[str]) -> None:
+    # Refills right after a write must not cache what a lagging replica
+    # still returns under the new generation
+    read_router.pin_to_primary(settings.db_replica_pin_seconds)
+
+
+add_invalidation_listener(_pin_after_write)
+
 
 class Base(DeclarativeBase):
     pass
@@ -22,3 +184,89 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+class ReadSession(AsyncSession):
+    """Session that reads over one pooled connection in autocommit mode.
+
+    The first statement checks out a connection from ``read_router`` and
+    the session keeps it until it closes, so a request pays one checkout
+    (and one pre-ping) however many statements it runs, and autocommit
+    spares it the BEGIN/COMMIT round trips. A handler served from cache
+    never touches the pool. The tradeoff is that the connection stays out
+    of the pool from the first statement to the end of the request, not
+    just while statements run. Objects are not expired, so everything
+    loaded stays usable. Never write through it.
+    """
+
+    _read_conn: AsyncConnection | None = None
+
+    async def _on_connection(
+        self, method: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        if self._read_conn is None:
+            conn = await read_router.connect()
+            try:
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+            except Exception:
+                await conn.close()
+                raise
+            self._read_conn = conn
+            self.sync_session.bind = conn.sync_connection
+        try:
+            result = await method(*args, **kwargs)
+        except Exception:
+            await self.rollback()
+            raise
+        # Ends the session's transaction; autocommit leaves nothing to commit
+        await self.commit()
+        return result
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            conn, self._read_conn = self._read_conn, None
+            if conn is not None:
+                self.sync_session.bind = None
+                await conn.close()
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Any:
+        # Outside a statement there is no connection; callers only want the
+        # dialect, which replicas share with the primary
+        if self.sync_session.bind is None:
+            return read_router.primary.sync_engine
+        return super().get_bind(*args, **kwargs)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._on_connection(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._on_connection(super().scalar, *args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._on_connection(super().get, *args, **kwargs)
+
+
+read_session = async_sessionmaker(class_=ReadSession, expire_on_commit=False)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session() as session:
+        yield session
+
+
+async def run_in_session(
+    func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+) -> T:
+    """Run ``func`` with a fresh session, for work outside a request."""
+    async with async_session() as session:
+        return await func(session, *args, **kwargs)
+
+
+async def run_in_read_session(
+    func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+) -> T:
+    """Like ``run_in_session``, routed to a read replica."""
+    async with read_session() as session:
+        return await func(session, *args, **kwargs)
@@ -1,17 +1,48 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
-from app.core.cache import close_redis, get_redis
+from app.core.cache import (
+    close_redis,
+    get_redis,
+    listen_for_invalidations,
+    local_cache,
+    run_refresher,
+)
 from app.core.config import settings
+from app.database import engine, pool_stats, read_router
+from app.services.bitmap_index import run_bitmap_indexer
+from app.services.cache_warmup import run_warmup
+from app.services.popular import run_popular_refresher
+from app.services.suggest import run_suggest_indexer
+from app.services.trending import run_trending_refresher
+from app.services.view_counter import run_view_flusher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await get_redis()
-    yield
+    async with asyncio.TaskGroup() as task_group:
+        background_tasks = [
+            task_group.create_task(listen_for_invalidations()),
+            task_group.create_task(run_refresher()),
+            task_group.create_task(run_view_flusher()),
+            task_group.create_task(run_suggest_indexer()),
+        ]
+        if settings.cache_warmup_enabled:
+            background_tasks.append(task_group.create_task(run_warmup(app)))
+        if settings.popular_lists_enabled:
+            background_tasks.append(task_group.create_task(run_popular_refresher()))
+        if settings.trending_enabled:
+            background_tasks.append(task_group.create_task(run_trending_refresher()))
+        if settings.bitmap_index_enabled:
+            background_tasks.append(task_group.create_task(run_bitmap_indexer()))
+        yield
+        for task in background_tasks:
+            task.cancel()
     await close_redis()
 
 
@@ -34,3 +65,13 @@ app.include_router(api_router, prefix=settings.api_v1_prefix)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/cache")
+async def cache_health():
+    return {"local": local_cache.stats()}
+
+
+@app.get("/health/db")
+async def db_health():
+    return {"primary": pool_stats(engine), "replicas": read_router.stats()}
@@ -9,6 +9,7 @@ from app.models.website import (
     website_collections,
     website_styles,
 )
+from app.models.website_counts import reconcile_website_counts
 
 __all__ = [
     "Category",
@@ -17,6 +18,7 @@ __all__ = [
     "Style",
     "User",
     "Website",
+    "reconcile_website_counts",
     "website_categories",
     "website_collections",
     "website_styles",
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from sqlalchemy import (
     Boolean,
     Column,
+    Computed,
     DateTime,
     ForeignKey,
     Index,
@@ -10,7 +11,10 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    column,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -20,6 +24,8 @@ website_categories = Table(
     Base.metadata,
     Column("website_id", Integer, ForeignKey("websites.id", ondelete="CASCADE"), primary_key=True),
     Column("category_id", Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads with website_id; listings join from the category side
+    Index("ix_website_categories_category_id", "category_id", "website_id"),
 )
 
 website_styles = Table(
@@ -27,6 +33,8 @@ website_styles = Table(
     Base.metadata,
     Column("website_id", Integer, ForeignKey("websites.id", ondelete="CASCADE"), primary_key=True),
     Column("style_id", Integer, ForeignKey("styles.id", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads with website_id; listings join from the style side
+    Index("ix_website_styles_style_id", "style_id", "website_id"),
 )
 
 website_collections = Table(
@@ -34,14 +42,49 @@ website_collections = Table(
     Base.metadata,
     Column("website_id", Integer, ForeignKey("websites.id", ondelete="CASCADE"), primary_key=True),
     Column("collection_id", Integer, ForeignKey("collections.id", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads with website_id; listings join from the collection side
+    Index("ix_website_collections_collection_id", "collection_id", "website_id"),
 )
 
+ACTIVE = column("is_active").is_(True)
+FEATURED = column("is_featured").is_(True) & ACTIVE
+
+# Text search configuration for the stored document and for parsing queries
+SEARCH_CONFIG = "english"
+
+# Title matches rank above description matches
+SEARCH_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+
+@compiles(Computed, "sqlite")
+def _compile_computed_sqlite(element: Computed, compiler, **kw) -> str:
+    # SQLite has no text search functions; the search document stays NULL there
+    if element.column.name == "search_vector":
+        return ""
+    return compiler.visit_computed_column(element, **kw)
+
 
 class Website(Base):
     __tablename__ = "websites"
     __table_args__ = (
         Index("ix_websites_fulltext", "title", "description", postgresql_using="gin",
               postgresql_ops={"title": "gin_trgm_ops", "description": "gin_trgm_ops"}),
+        Index("ix_websites_search_vector", "search_vector", postgresql_using="gin"),
+        # Partial indexes for each listing order; the predicates match the
+        # ``is_active IS true`` filters CRUDWebsite renders, so planners can
+        # prove they apply. Backward scans serve the DESC orderings.
+        Index("ix_websites_active_created", "created_at", "id",
+              postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        Index("ix_websites_active_popular", "view_count", "id",
+              postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        Index("ix_websites_active_title", "title", "id",
+              postgresql_where=ACTIVE, sqlite_where=ACTIVE),
+        Index("ix_websites_featured_created", "created_at", "id",
+              postgresql_where=FEATURED, sqlite_where=FEATURED),
+        Index("ix_websites_platform_id", "platform_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -63,6 +106,12 @@ class Website(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    # Generated by the database from title and description; never loaded
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"),
+        Computed(SEARCH_DOCUMENT, persisted=True),
+        deferred=True,
+    )
 
     platform: Mapped["Platform | None"] = relationship(back_populates="websites")  # noqa: F821
     categories: Mapped[list["Category"]] = relationship(  # noqa: F821
@@ -0,0 +1,137 @@
+"""Keep ``website_count`` on categories, styles, collections and platforms exact.
+
+A website counts towards every taxonomy it belongs to while it is active.
+Each ORM flush that creates, deletes, (de)activates or re-tags websites
+shifts the affected counters by the difference, in the same transaction.
+Bulk Core writes bypass the hook; follow them with
+``reconcile_website_counts`` (``scripts/reconcile_counts.py``).
+"""
+
+from collections import Counter
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import Table, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.category import Category
+from app.models.collection import Collection
+from app.models.platform import Platform
+from app.models.style import Style
+from app.models.website import (
+    Website,
+    website_categories,
+    website_collections,
+    website_styles,
+)
+
+MEMBERSHIPS: dict[str, type] = {
+    "categories": Category,
+    "styles": Style,
+    "collections": Collection,
+}
+
+JUNCTIONS: dict[type, tuple[Table, str]] = {
+    Category: (website_categories, "category_id"),
+    Style: (website_styles, "style_id"),
+    Collection: (website_collections, "collection_id"),
+}
+
+Membership = set[tuple[type, int]]
+
+
+def _value_before(website: Website, key: str) -> Any:
+    history = inspect(website).attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(website, key)
+
+
+def _membership(website: Website, *, before: bool) -> Membership:
+    active = _value_before(website, "is_active") if before else website.is_active
+    if not active:
+        return set()
+    platform_id = _value_before(website, "platform_id") if before else website.platform_id
+    members = {(Platform, platform_id)} if platform_id is not None else set()
+    for key, model in MEMBERSHIPS.items():
+        history = inspect(website).attrs[key].history
+        items = chain(history.unchanged, history.deleted if before else history.added)
+        members.update((model, item.id) for item in items)
+    return members
+
+
+@event.listens_for(Session, "before_flush")
+def _load_memberships(session: Session, flush_context: Any, instances: Any) -> None:
+    # Deleted or edited websites need their current tags loaded to diff
+    # against; afterwards the junction rows may already be gone
+    for website in chain(session.dirty, session.deleted):
+        if isinstance(website, Website):
+            for key in MEMBERSHIPS:
+                getattr(website, key)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_count_changes(session: Session, flush_context: Any) -> None:
+    # Session state and attribute history still describe the flushed changes
+    deltas: Counter[tuple[type, int]] = Counter()
+    for website in session.new:
+        if isinstance(website, Website):
+            deltas.update(_membership(website, before=False))
+    for website in session.dirty:
+        if isinstance(website, Website) and session.is_modified(website):
+            deltas.update(_membership(website, before=False))
+            deltas.subtract(_membership(website, before=True))
+    for website in session.deleted:
+        if isinstance(website, Website):
+            deltas.subtract(_membership(website, before=True))
+
+    grouped: dict[tuple[type, int], list[int]] = {}
+    for (model, id), delta in deltas.items():
+        if delta:
+            grouped.setdefault((model, delta), []).append(id)
+
+    connection = session.connection()
+    for (model, delta), ids in grouped.items():
+        table = model.__table__
+        connection.execute(
+            update(table)
+            .where(table.c.id.in_(ids))
+            .values(website_count=table.c.website_count + delta)
+        )
+        # Keep loaded instances in step without expiring them
+        for id in ids:
+            obj = session.identity_map.get(session.identity_key(model, id))
+            if obj is not None:
+                set_committed_value(obj, "website_count", obj.website_count + delta)
+
+
+def _active_count(model: type):
+    """Correlated count of active websites in each row of ``model``."""
+    if model is Platform:
+        return (
+            select(func.count(Website.id))
+            .where(Website.platform_id == model.id, Website.is_active.is_(True))
+            .scalar_subquery()
+        )
+    junction, column = JUNCTIONS[model]
+    return (
+        select(func.count(Website.id))
+        .join(junction, junction.c.website_id == Website.id)
+        .where(junction.c[column] == model.id, Website.is_active.is_(True))
+        .scalar_subquery()
+    )
+
+
+async def reconcile_website_counts(db: AsyncSession) -> dict[str, int]:
+    """Recompute every counter from scratch; returns rows corrected per table."""
+    corrected = {}
+    for model in (Category, Style, Collection, Platform):
+        actual = _active_count(model)
+        result = await db.execute(
+            update(model)
+            .where(model.website_count != actual)
+            .values(website_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        corrected[model.__tablename__] = result.rowcount
+    return corrected
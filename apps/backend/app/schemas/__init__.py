@@ -1,12 +1,20 @@
 from app.schemas.auth import LoginRequest, Token
 from app.schemas.category import CategoryCreate, CategoryRead
 from app.schemas.collection import CollectionCreate, CollectionRead
-from app.schemas.common import PaginatedResponse, PaginationParams
+from app.schemas.common import (
+    Cursor,
+    FacetCount,
+    FacetedPage,
+    Facets,
+    PaginatedResponse,
+    PaginationParams,
+)
 from app.schemas.platform import PlatformCreate, PlatformRead
 from app.schemas.style import StyleCreate, StyleRead
 from app.schemas.user import UserCreate, UserRead
 from app.schemas.website import (
     WebsiteCreate,
+    WebsiteFilter,
     WebsiteListItem,
     WebsiteRead,
     WebsiteUpdate,
@@ -17,6 +25,10 @@ __all__ = [
     "CategoryRead",
     "CollectionCreate",
     "CollectionRead",
+    "Cursor",
+    "FacetCount",
+    "FacetedPage",
+    "Facets",
     "LoginRequest",
     "PaginatedResponse",
     "PaginationParams",
@@ -28,6 +40,7 @@ __all__ = [
     "UserCreate",
     "UserRead",
     "WebsiteCreate",
+    "WebsiteFilter",
     "WebsiteListItem",
     "WebsiteRead",
     "WebsiteUpdate",
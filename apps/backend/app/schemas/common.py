@@ -1,4 +1,8 @@
-from typing import Generic, TypeVar
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Generic, NamedTuple, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -16,9 +20,63 @@ class PaginationParams(BaseModel):
         return (self.page - 1) * self.size
 
 
+class Cursor(NamedTuple):
+    """Keyset position after the last row of a newest-first page."""
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        """Parse an opaque cursor; raises ``ValueError`` when malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, id = json.loads(raw)
+            return cls(datetime.fromisoformat(created_at), int(id))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Invalid cursor") from exc
+
+    @classmethod
+    def after(cls, items: list, size: int) -> str | None:
+        """Cursor for the page following ``items``, or None on the last page."""
+        if len(items) < size or not items:
+            return None
+        return cls(items[-1].created_at, items[-1].id).encode()
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    # None when the client skipped the exact total with with_total=false
+    total: int | None
     page: int
     size: int
-    pages: int
+    pages: int | None
+    next_cursor: str | None = None
+
+
+class FacetCount(BaseModel):
+    slug: str
+    title: str
+    count: int
+
+
+class Facets(BaseModel):
+    categories: list[FacetCount]
+    styles: list[FacetCount]
+    collections: list[FacetCount]
+    platforms: list[FacetCount]
+
+
+class FacetedPage(PaginatedResponse[T], Generic[T]):
+    # Counts over the whole result set, not just this page, when requested
+    facets: Facets | None = None
+
+
+def page_count(total: int | None, size: int) -> int | None:
+    if total is None:
+        return None
+    return math.ceil(total / size) if size else 0
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    title: str
+    slug: str
+
+
+class Suggestions(BaseModel):
+    websites: list[Suggestion]
+    categories: list[Suggestion]
+    styles: list[Suggestion]
+    collections: list[Suggestion]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -59,3 +60,27 @@ class WebsiteListItem(WebsiteBase):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+WebsiteSort = Literal["newest", "popular", "alpha"]
+
+# Category, style and collection listings; popular reads a ranked list
+TaxonomySort = Literal["newest", "popular"]
+
+
+class WebsiteFilter(BaseModel):
+    """Listing filters by taxonomy slug; every field given narrows the set.
+
+    Values within one taxonomy match any of them, or all of them with
+    ``match="all"``; different taxonomies always combine with AND. A
+    website has a single platform, so platforms always match any.
+    """
+
+    category: list[str] = []
+    style: list[str] = []
+    collection: list[str] = []
+    platform: list[str] = []
+    match: Literal["any", "all"] = "any"
+    featured: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
@@ -0,0 +1,381 @@
+"""In-memory bitmap index over the active catalog, for filtered listings.
+
+Active websites get dense positions in newest-first order. Every category,
+style, collection and platform value is a bitset over those positions,
+packed into ``uint64`` words, so a multi-filter listing is a few word-wise
+AND/ORs and its total a popcount. Facets popcount every value against the
+filter at once. SQL only fetches the rows of the final page.
+
+Opt-in with ``bitmap_index_enabled``. Each worker builds the index at
+startup, reading from the primary and packing the bitsets in a thread, and
+rebuilds it ``bitmap_index_debounce_seconds`` after a burst of writes to
+indexed data. From the moment a worker hears of such a write until the
+rebuild lands, its listings fall back to SQL. ``bitmap_index_max_age_seconds``
+bounds how far popularity order lags the buffered view counts.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import add_invalidation_listener
+from app.core.config import settings
+from app.crud.website import SORT_ORDERS
+from app.database import run_in_session
+from app.models import (
+    Category,
+    Collection,
+    Platform,
+    Style,
+    Website,
+    website_categories,
+    website_collections,
+    website_styles,
+)
+from app.schemas.website import WebsiteFilter, WebsiteSort
+
+logger = logging.getLogger(__name__)
+
+# Invalidating any of these can change what the index holds
+INDEXED_TAGS = {"websites", "categories", "styles", "collections", "platforms"}
+
+# WebsiteFilter field -> (facet name, taxonomy, junction table, junction column)
+TAXONOMIES = {
+    "category": ("categories", Category, website_categories, "category_id"),
+    "style": ("styles", Style, website_styles, "style_id"),
+    "collection": ("collections", Collection, website_collections, "collection_id"),
+    "platform": ("platforms", Platform, None, None),
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+ONE = np.uint64(1)
+ALL = np.uint64(2**64 - 1)
+
+
+def pack(bits: np.ndarray) -> np.ndarray:
+    """Pack booleans along the last axis into little-endian ``uint64`` words."""
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, padding)])
+    return np.ascontiguousarray(packed).view("<u8")
+
+
+def unpack(words: np.ndarray, size: int) -> np.ndarray:
+    return np.unpackbits(words.view(np.uint8), count=size, bitorder="little").view(bool)
+
+
+def timestamp(moment: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes (SQLite) are UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+class Taxonomy:
+    """Bitsets for every value of one taxonomy, one row of words each."""
+
+    def __init__(
+        self, values: list[Any], positions: np.ndarray, value_ids: np.ndarray, size: int
+    ) -> None:
+        self.slugs = [value.slug for value in values]
+        self.titles = [value.title for value in values]
+        self.active = np.array([value.is_active for value in values], dtype=bool)
+        self.rows = {slug: row for row, slug in enumerate(self.slugs)}
+
+        ids = np.array([value.id for value in values], dtype=np.int64)
+        rows = np.searchsorted(ids, value_ids)
+        # Each membership sets its bit in place, like ``pack`` would lay it out
+        self.bits = np.zeros((len(values), -(-size // 64)), dtype=np.uint64)
+        np.bitwise_or.at(
+            self.bits, (rows, positions >> 6), ONE << (positions & 63).astype(np.uint64)
+        )
+
+    def match(self, slugs: list[str], *, every: bool, empty: np.ndarray) -> np.ndarray:
+        rows = [self.rows.get(slug) for slug in set(slugs)]
+        if every and None in rows:
+            return empty
+        rows = [row for row in rows if row is not None]
+        if not rows:
+            return empty
+        reduce = np.bitwise_and.reduce if every else np.bitwise_or.reduce
+        return reduce(self.bits[rows], axis=0)
+
+    def counts(self, mask: np.ndarray) -> list[dict[str, Any]]:
+        bits = self.bits
+        words = np.flatnonzero(mask)
+        # Narrow filters leave most words empty; skip them for every value
+        if words.size < mask.size // 2:
+            bits, mask = bits[:, words], mask[words]
+            np.bitwise_and(bits, mask, out=bits)
+        else:
+            bits = bits & mask
+        counts = np.bitwise_count(bits, out=bits).sum(axis=1, dtype=np.int64)
+        facets = [
+            {"slug": self.slugs[row], "title": self.titles[row], "count": int(counts[row])}
+            for row in np.flatnonzero((counts > 0) & self.active).tolist()
+        ]
+        facets.sort(key=lambda facet: (-facet["count"], facet["title"]))
+        return facets
+
+
+class BitmapIndex:
+    """Bitsets over the active websites, positioned newest first."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        created_at: np.ndarray,
+        featured: np.ndarray,
+        orders: dict[str, np.ndarray],
+        taxonomies: dict[str, Taxonomy],
+    ) -> None:
+        self.size = ids.size
+        self.ids = ids
+        # Negated, so it ascends with position like ``searchsorted`` needs
+        self.age = -created_at
+        self.orders = orders
+        self.taxonomies = taxonomies
+        self.featured = pack(featured)
+        self.everything = pack(np.ones(self.size, dtype=bool))
+        self.nothing = np.zeros_like(self.everything)
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "BitmapIndex":
+        """Read the active catalog, then build the index in a worker thread."""
+        active = Website.is_active.is_(True)
+        result = await db.execute(
+            select(Website.id, Website.created_at, Website.is_featured, Website.platform_id)
+            .where(active)
+            .order_by(Website.created_at.desc(), Website.id.desc())
+        )
+        rows = result.all()
+
+        # Orders come from the database, which knows its title collation
+        orders = {}
+        for sort, order_by in SORT_ORDERS.items():
+            ordered = await db.scalars(select(Website.id).where(active).order_by(*order_by))
+            orders[sort] = ordered.all()
+
+        memberships = {}
+        for name, (_, model, junction, column) in TAXONOMIES.items():
+            values = (await db.execute(
+                select(model.id, model.slug, model.title, model.is_active).order_by(model.id)
+            )).all()
+            pairs = None
+            if junction is not None:
+                pairs = (await db.execute(
+                    select(junction.c.website_id, junction.c[column])
+                    .join(Website, Website.id == junction.c.website_id)
+                    .where(active)
+                )).all()
+            memberships[name] = (values, pairs)
+
+        # Seconds of CPU on a large catalog; keep it off the event loop
+        return await asyncio.to_thread(cls._build, rows, orders, memberships)
+
+    @classmethod
+    def _build(
+        cls,
+        rows: list[Any],
+        orders: dict[str, list[int]],
+        memberships: dict[str, tuple[list[Any], list[Any] | None]],
+    ) -> "BitmapIndex":
+        size = len(rows)
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=size)
+        by_id = np.argsort(ids)
+
+        def positions_of(website_ids: list[int]) -> np.ndarray:
+            wanted = np.array(website_ids, dtype=np.int64)
+            return by_id[np.searchsorted(ids, wanted, sorter=by_id)]
+
+        taxonomies = {}
+        for name, (values, pairs) in memberships.items():
+            if pairs is None:
+                platform_ids = np.fromiter(
+                    (row.platform_id or 0 for row in rows), dtype=np.int64, count=size
+                )
+                positions = np.flatnonzero(platform_ids)
+                value_ids = platform_ids[positions]
+            else:
+                positions = positions_of([website_id for website_id, _ in pairs])
+                value_ids = np.array([value_id for _, value_id in pairs], dtype=np.int64)
+            taxonomies[name] = Taxonomy(values, positions, value_ids, size)
+
+        created_at = np.fromiter(
+            (timestamp(row.created_at) for row in rows), dtype=np.int64, count=size
+        )
+        featured = np.fromiter((row.is_featured for row in rows), dtype=bool, count=size)
+        return cls(
+            ids,
+            created_at,
+            featured,
+            {sort: positions_of(ordered) for sort, ordered in orders.items()},
+            taxonomies,
+        )
+
+    def _span(self, start: int, end: int | None = None) -> np.ndarray:
+        """Bitset of positions ``start`` up to ``end``."""
+        end = self.size if end is None else end
+        words = np.zeros_like(self.everything)
+        if start < end:
+            first, last = start // 64, (end - 1) // 64
+            words[first : last + 1] = ALL
+            words[first] &= ALL << np.uint64(start % 64)
+            words[last] &= ALL >> np.uint64(63 - (end - 1) % 64)
+        return words
+
+    def _created_since(self, moment: datetime) -> int:
+        """Positions created at or after ``moment``, which all lead the order."""
+        return int(np.searchsorted(self.age, -timestamp(moment), side="right"))
+
+    def _after(self, cursor: tuple[datetime, int]) -> int:
+        """First position past the keyset ``cursor``."""
+        created_at, id = cursor
+        start = int(np.searchsorted(self.age, -timestamp(created_at), side="left"))
+        end = self._created_since(created_at)
+        # Within one timestamp ids descend
+        return start + int(np.searchsorted(-self.ids[start:end], -id, side="right"))
+
+    def mask(self, website_filter: WebsiteFilter) -> np.ndarray:
+        """Bitset of the positions ``website_filter`` allows."""
+        mask = self.everything.copy()
+        every = website_filter.match == "all"
+        for name, taxonomy in self.taxonomies.items():
+            slugs = getattr(website_filter, name)
+            if slugs:
+                # A website has one platform; several can only match any
+                mask &= taxonomy.match(
+                    slugs, every=every and name != "platform", empty=self.nothing
+                )
+        if website_filter.featured is not None:
+            mask &= self.featured if website_filter.featured else ~self.featured
+        if website_filter.created_after or website_filter.created_before:
+            # Positions are newest first, so a date range is one span
+            start = end = None
+            if website_filter.created_before is not None:
+                start = self._created_since(website_filter.created_before)
+            if website_filter.created_after is not None:
+                end = self._created_since(website_filter.created_after)
+            mask &= self._span(start or 0, end)
+        return mask
+
+    def page(
+        self,
+        website_filter: WebsiteFilter,
+        *,
+        sort: WebsiteSort = "newest",
+        offset: int = 0,
+        limit: int = 20,
+        after: tuple[datetime, int] | None = None,
+    ) -> tuple[list[int], int]:
+        """Website ids of one page, in order, and the filter's total.
+
+        Like ``crud_website.get_filtered``, ``after`` only applies to
+        ``sort="newest"``.
+        """
+        mask = self.mask(website_filter)
+        total = int(np.bitwise_count(mask).sum(dtype=np.int64))
+        if after is not None:
+            mask &= self._span(self._after(after))
+        if sort == "newest":
+            positions = self._nth(mask, offset, limit)
+        else:
+            positions = self._scan(self.orders[sort], mask, offset + limit)[offset:]
+        return self.ids[positions].tolist(), total
+
+    @staticmethod
+    def _nth(mask: np.ndarray, offset: int, limit: int) -> np.ndarray:
+        """Set positions ``offset`` to ``offset + limit`` of ``mask``.
+
+        Running popcounts find the words holding them; only those unpack.
+        """
+        seen = np.cumsum(np.bitwise_count(mask), dtype=np.int64)
+        first = int(np.searchsorted(seen, offset, side="right"))
+        last = int(np.searchsorted(seen, offset + limit, side="left"))
+        words = mask[first : last + 1]
+        positions = first * 64 + np.flatnonzero(unpack(words, words.size * 64))
+        skip = offset - (int(seen[first - 1]) if first else 0)
+        return positions[skip : skip + limit]
+
+    @staticmethod
+    def _scan(order: np.ndarray, mask: np.ndarray, wanted: int) -> np.ndarray:
+        """The first ``wanted`` positions of ``order`` set in ``mask``.
+
+        Reads ``order`` in doubling chunks, so an early page of a broad
+        filter stops long before the end.
+        """
+        found = []
+        count = 0
+        start, chunk = 0, 4096
+        while count < wanted and start < order.size:
+            positions = order[start : start + chunk]
+            bits = mask[positions >> 6] >> (positions & 63).astype(np.uint64)
+            hits = positions[(bits & ONE).astype(bool)]
+            found.append(hits)
+            count += hits.size
+            start, chunk = start + chunk, chunk * 2
+        return np.concatenate(found)[:wanted] if found else order[:0]
+
+    def facets(self, website_filter: WebsiteFilter) -> dict[str, list[dict[str, Any]]]:
+        """Counts per taxonomy value, shaped like ``crud_website.facet_counts``."""
+        mask = self.mask(website_filter)
+        return {
+            TAXONOMIES[name][0]: taxonomy.counts(mask)
+            for name, taxonomy in self.taxonomies.items()
+        }
+
+
+_index: BitmapIndex | None = None
+_rebuild: asyncio.Event | None = None
+
+
+def current_bitmap_index() -> BitmapIndex | None:
+    """The index, or None while disabled, building or retired by a write."""
+    return _index
+
+
+def _on_invalidate(tags: list[str]) -> None:
+    global _index
+    if INDEXED_TAGS.intersection(tags):
+        _index = None
+        if _rebuild is not None:
+            _rebuild.set()
+
+
+add_invalidation_listener(_on_invalidate)
+
+
+async def run_bitmap_indexer() -> None:
+    """Build the index, then rebuild it after bursts of writes and as it ages."""
+    global _index, _rebuild
+    _rebuild = asyncio.Event()
+    try:
+        while True:
+            _rebuild.clear()
+            try:
+                index = await run_in_session(BitmapIndex.load)
+            except Exception:
+                logger.exception("Bitmap index build failed; listings use SQL")
+            else:
+                # A write during the build retired it already; build again
+                if not _rebuild.is_set():
+                    _index = index
+                    logger.info("Bitmap index built over %d websites", index.size)
+            try:
+                await asyncio.wait_for(
+                    _rebuild.wait(), settings.bitmap_index_max_age_seconds
+                )
+                # Let a burst of admin writes settle before rebuilding once
+                await asyncio.sleep(settings.bitmap_index_debounce_seconds)
+            except TimeoutError:
+                pass
+    finally:
+        _index = None
+        _rebuild = None
@@ -0,0 +1,144 @@
+"""Pre-populate the response cache so the first wave of traffic hits warm keys.
+
+Warm-up replays the hottest GET routes through the ASGI app in-process, so
+it fills exactly the keys, loaders and TTLs that real requests use.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+
+import redis.asyncio as redis
+from starlette.types import ASGIApp, Message
+
+from app.core.cache import (
+    LOCK_PREFIX,
+    add_invalidation_listener,
+    get_redis,
+    release_lock,
+    remove_invalidation_listener,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WARMUP_LOCK = f"{LOCK_PREFIX}warmup"
+
+# Invalidating any of these retires the pages warm-up fills
+WARMUP_TRIGGER_TAGS = {"websites"}
+
+TAXONOMIES = ("categories", "styles", "collections")
+
+
+async def asgi_get(app: ASGIApp, path: str, query: str = "") -> tuple[int, bytes]:
+    """Issue a GET against ``app`` without a network hop."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", b"identity")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    status_code = 500
+    chunks: list[bytes] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status_code, b"".join(chunks)
+
+
+async def warm_cache(
+    app: ASGIApp,
+    *,
+    pages: int = settings.cache_warmup_pages,
+    concurrency: int = settings.cache_warmup_concurrency,
+) -> int:
+    """Fill reference lists, hot listings and every taxonomy's first page.
+
+    Returns the number of routes that were warmed successfully.
+    """
+    prefix = settings.api_v1_prefix
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(path: str, query: str = "") -> tuple[int, bytes]:
+        async with semaphore:
+            try:
+                return await asgi_get(app, prefix + path, query)
+            except Exception:
+                logger.exception("Cache warm-up failed for %s", path)
+                return 500, b""
+
+    reference = ["/platforms", *(f"/{name}" for name in TAXONOMIES)]
+    routes = [
+        ("/websites/featured", ""),
+        ("/websites/latest", ""),
+        ("/websites/popular", ""),
+        ("/websites/trending", ""),
+        *(("/websites", f"page={page}") for page in range(1, pages + 1)),
+    ]
+
+    # Taxonomy lists come first so their slugs can drive the per-slug pages
+    results = await asyncio.gather(*(fetch(path) for path in reference))
+    for name, (status_code, body) in zip(reference[1:], results[1:]):
+        if status_code == 200:
+            routes.extend((f"{name}/{item['slug']}/websites", "") for item in json.loads(body))
+
+    results += await asyncio.gather(*(fetch(path, query) for path, query in routes))
+    return sum(1 for status_code, _ in results if status_code == 200)
+
+
+async def warm_cache_exclusively(app: ASGIApp) -> None:
+    """Warm the cache unless another worker is already doing it."""
+    token = secrets.token_hex(8)
+    try:
+        r = await get_redis()
+        acquired = await r.set(
+            WARMUP_LOCK, token, nx=True, ex=settings.cache_warmup_lock_seconds
+        )
+        if not acquired:
+            return
+        try:
+            warmed = await warm_cache(app)
+            logger.info("Cache warm-up filled %d routes", warmed)
+        finally:
+            await release_lock(r, WARMUP_LOCK, token)
+    except redis.RedisError:
+        logger.warning("Cache warm-up skipped: Redis unavailable")
+
+
+async def run_warmup(app: ASGIApp) -> None:
+    """Warm on startup, then again after every burst of bulk invalidations."""
+    invalidated = asyncio.Event()
+
+    def on_invalidate(tags: list[str]) -> None:
+        if WARMUP_TRIGGER_TAGS.intersection(tags):
+            invalidated.set()
+
+    add_invalidation_listener(on_invalidate)
+    try:
+        await warm_cache_exclusively(app)
+        while True:
+            await invalidated.wait()
+            # Let a burst of admin writes settle before re-warming once
+            await asyncio.sleep(settings.cache_warmup_debounce_seconds)
+            invalidated.clear()
+            await warm_cache_exclusively(app)
+    finally:
+        remove_invalidation_listener(on_invalidate)
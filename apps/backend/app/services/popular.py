@@ -0,0 +1,242 @@
+"""Ranked popular lists kept in Redis sorted sets.
+
+One sorted set ranks every active website by ``view_count``; one more per
+category, style, collection and platform ranks its members. Members are
+zero-padded ids, so ties fall back to the newest id as in SQL. Reading a
+page is one ``ZREVRANGE`` plus a primary-key fetch of its rows, whatever
+the catalog size.
+
+Flushed views bump every list the website is in (``add_popular_views``).
+A background worker rebuilds all lists from the database on startup,
+after admin writes and every ``popular_rebuild_interval_seconds``, which
+also repairs anything the increments missed. Until the first rebuild
+finishes, readers get None and fall back to SQL.
+"""
+
+import asyncio
+import logging
+import secrets
+from collections.abc import Mapping
+from typing import Any
+
+import redis.asyncio as redis
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import (
+    LOCK_PREFIX,
+    add_invalidation_listener,
+    get_redis,
+    release_lock,
+    remove_invalidation_listener,
+)
+from app.core.config import settings
+from app.crud.website import crud_website
+from app.database import run_in_session
+from app.models import Website, website_categories, website_collections, website_styles
+from app.schemas.website import WebsiteFilter
+
+logger = logging.getLogger(__name__)
+
+POPULAR_PREFIX = "popular:"
+# Set of every live list key, so a rebuild can drop lists that emptied
+KEYS_KEY = f"{POPULAR_PREFIX}keys"
+# Present once a rebuild has completed
+BUILT_KEY = f"{POPULAR_PREFIX}built"
+REBUILD_LOCK = f"{LOCK_PREFIX}popular"
+
+# Invalidating any of these can move websites between lists
+REBUILD_TRIGGER_TAGS = {"websites"}
+
+# List kind -> (junction table, junction column); platforms are a column
+JUNCTIONS = {
+    "category": (website_categories, "category_id"),
+    "style": (website_styles, "style_id"),
+    "collection": (website_collections, "collection_id"),
+}
+
+BATCH = 10_000
+
+
+def popular_key(kind: str | None = None, id: int | None = None) -> str:
+    """Key of the global list, or of one taxonomy value's list."""
+    if kind is None:
+        return f"{POPULAR_PREFIX}all"
+    return f"{POPULAR_PREFIX}{kind}:{id}"
+
+
+def _member(website_id: int) -> str:
+    return f"{website_id:012d}"
+
+
+async def _lists_of(
+    db: AsyncSession, website_ids: list[int] | None = None
+) -> dict[int, list[str]]:
+    """Keys of every list each active website belongs to."""
+    stmt = select(Website.id, Website.platform_id).where(Website.is_active.is_(True))
+    if website_ids is not None:
+        stmt = stmt.where(Website.id.in_(website_ids))
+    lists: dict[int, list[str]] = {}
+    for website_id, platform_id in await db.execute(stmt):
+        lists[website_id] = [popular_key()]
+        if platform_id is not None:
+            lists[website_id].append(popular_key("platform", platform_id))
+    for kind, (junction, column) in JUNCTIONS.items():
+        stmt = select(junction.c.website_id, junction.c[column])
+        if website_ids is not None:
+            stmt = stmt.where(junction.c.website_id.in_(website_ids))
+        for website_id, value_id in await db.execute(stmt):
+            if website_id in lists:
+                lists[website_id].append(popular_key(kind, value_id))
+    return lists
+
+
+async def rebuild_popular_lists(db: AsyncSession) -> int:
+    """Rebuild every list from ``view_count``; returns the number of lists.
+
+    Each list is filled under a temporary key and renamed over the live
+    one, so readers never see a half-built list.
+    """
+    lists = await _lists_of(db)
+    result = await db.execute(
+        select(Website.id, Website.view_count).where(Website.is_active.is_(True))
+    )
+    views = dict(result.all())
+
+    members: dict[str, dict[str, int]] = {popular_key(): {}}
+    for website_id, keys in lists.items():
+        for key in keys:
+            members.setdefault(key, {})[_member(website_id)] = views[website_id]
+
+    build = secrets.token_hex(4)
+    r = await get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for key, scores in members.items():
+            items = list(scores.items())
+            pipe.delete(f"{key}:{build}")
+            for start in range(0, len(items), BATCH):
+                pipe.zadd(f"{key}:{build}", dict(items[start : start + BATCH]))
+        await pipe.execute()
+
+    previous = {key.decode() for key in await r.smembers(KEYS_KEY)}
+    async with r.pipeline(transaction=True) as pipe:
+        for key, scores in members.items():
+            if scores:
+                pipe.rename(f"{key}:{build}", key)
+            else:
+                pipe.delete(key)
+        pipe.delete(*previous - members.keys(), KEYS_KEY)
+        pipe.sadd(KEYS_KEY, *members)
+        pipe.set(BUILT_KEY, build)
+        await pipe.execute()
+    return len(members)
+
+
+async def add_popular_views(
+    db: AsyncSession, r: redis.Redis, views: Mapping[int, int]
+) -> None:
+    """Bump the lists of every website in ``views`` (counts keyed by id).
+
+    Websites missing from a list are left out; the next rebuild adds them.
+    """
+    lists = await _lists_of(db, list(views))
+    async with r.pipeline(transaction=False) as pipe:
+        for website_id, keys in lists.items():
+            for key in keys:
+                pipe.zadd(key, {_member(website_id): views[website_id]}, xx=True, incr=True)
+        await pipe.execute()
+
+
+async def popular_ids(key: str, offset: int, limit: int) -> list[int] | None:
+    """Website ids ranked ``offset`` to ``offset + limit`` of list ``key``.
+
+    None when the lists are not built yet or Redis is unreachable.
+    """
+    try:
+        r = await get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.exists(BUILT_KEY)
+            pipe.zrevrange(key, offset, offset + limit - 1)
+            built, members = await pipe.execute()
+    except redis.RedisError:
+        logger.warning("Popular lists unavailable; ranking in SQL")
+        return None
+    if not built:
+        return None
+    return [int(member) for member in members]
+
+
+async def popular_page(
+    db: AsyncSession,
+    *,
+    kind: str | None = None,
+    value: Any = None,
+    offset: int = 0,
+    limit: int = 20,
+) -> list[Row]:
+    """List rows of the most viewed websites, overall or in one taxonomy value.
+
+    Ranked in SQL while the lists are unavailable.
+    """
+    key = popular_key(kind, value.id) if kind else popular_key()
+    ids = await popular_ids(key, offset, limit)
+    if ids is not None:
+        return await crud_website.get_by_ids(db, ids)
+    if kind is None:
+        return await crud_website.get_popular(db, offset=offset, limit=limit)
+    items, _ = await crud_website.get_filtered(
+        db,
+        WebsiteFilter(**{kind: [value.slug]}),
+        sort="popular",
+        offset=offset,
+        limit=limit,
+        with_total=False,
+    )
+    return items
+
+
+async def rebuild_exclusively() -> None:
+    """Rebuild the lists unless another worker is already doing it."""
+    token = secrets.token_hex(8)
+    try:
+        r = await get_redis()
+        acquired = await r.set(
+            REBUILD_LOCK, token, nx=True, ex=settings.popular_rebuild_lock_seconds
+        )
+        if not acquired:
+            return
+        try:
+            count = await run_in_session(rebuild_popular_lists)
+            logger.info("Rebuilt %d popular lists", count)
+        finally:
+            await release_lock(r, REBUILD_LOCK, token)
+    except redis.RedisError:
+        logger.warning("Popular list rebuild skipped: Redis unavailable")
+
+
+async def run_popular_refresher() -> None:
+    """Rebuild on startup, after bursts of admin writes and on a schedule."""
+    invalidated = asyncio.Event()
+
+    def on_invalidate(tags: list[str]) -> None:
+        if REBUILD_TRIGGER_TAGS.intersection(tags):
+            invalidated.set()
+
+    add_invalidation_listener(on_invalidate)
+    try:
+        while True:
+            try:
+                await rebuild_exclusively()
+            except Exception:
+                logger.exception("Popular list rebuild failed")
+            try:
+                await asyncio.wait_for(
+                    invalidated.wait(), settings.popular_rebuild_interval_seconds
+                )
+                # Let a burst of admin writes settle before rebuilding once
+                await asyncio.sleep(settings.popular_rebuild_debounce_seconds)
+            except TimeoutError:
+                pass
+            invalidated.clear()
+    finally:
+        remove_invalidation_listener(on_invalidate)
@@ -0,0 +1,215 @@
+"""Typeahead suggestions from an in-memory prefix index.
+
+Each worker keeps active website titles and category, style and collection
+names as sorted, normalized keys. A lookup bisects to the keys that start
+with the typed prefix and returns the most popular matches, without a
+database or Redis round trip.
+
+A background worker builds the index from the primary at startup, and
+again after admin writes reach it through the cache invalidation channel.
+Lookups keep the previous index until the new one is ready, so a write
+never puts a rebuild on the request path. ``suggest_index_max_age_seconds``
+bounds staleness if a message is missed.
+"""
+
+import asyncio
+import bisect
+import heapq
+import logging
+import unicodedata
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import add_invalidation_listener
+from app.core.config import settings
+from app.database import run_in_session
+from app.models import Category, Collection, Style, Website
+from app.schemas.search import Suggestion, Suggestions
+
+logger = logging.getLogger(__name__)
+
+# Invalidating any of these can add, rename or hide a suggestion
+SUGGEST_TAGS = {"websites", "categories", "styles", "collections"}
+
+TAXONOMIES = {"categories": Category, "styles": Style, "collections": Collection}
+
+MAX_SUGGESTIONS = 20
+
+# Prefixes matching more keys than this are ranked once at build time;
+# anything narrower is cheap enough to rank per request
+PRECOMPUTE_OVER = 256
+
+# Sorts after any character a key can contain
+_KEY_END = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """Casefold, drop accents and collapse whitespace."""
+    if text.isascii():
+        return " ".join(text.lower().split())
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join(
+        "".join(c for c in decomposed if not unicodedata.combining(c)).split()
+    )
+
+
+class PrefixIndex:
+    """Sorted keys searched with ``bisect``, one per word of each title.
+
+    Keying every word start lets "port" find "Minimal Portfolio". Matches
+    are ranked by popularity, then title.
+    """
+
+    def __init__(self, items: Iterable[tuple[str, str, int]]) -> None:
+        # (key, -popularity, title, slug), so sorting groups keys and a
+        # heap over a key range pops the most popular first
+        entries = []
+        for title, slug, popularity in items:
+            words = normalize(title).split()
+            entries.extend(
+                (" ".join(words[i:]), -popularity, title, slug)
+                for i in range(len(words))
+            )
+        entries.sort()
+        self._entries = entries
+        self._keys = [entry[0] for entry in entries]
+        self._top = self._precompute()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _range(self, prefix: str, start: int = 0, end: int | None = None) -> tuple[int, int]:
+        end = len(self._keys) if end is None else end
+        start = bisect.bisect_left(self._keys, prefix, start, end)
+        return start, bisect.bisect_left(self._keys, prefix + _KEY_END, start, end)
+
+    def _rank(self, start: int, end: int, limit: int) -> list[Suggestion]:
+        candidates = [entry[1:] for entry in self._entries[start:end]]
+        heapq.heapify(candidates)
+        seen: set[str] = set()
+        ranked = []
+        # A title can match on several of its words; suggest it once
+        while candidates and len(ranked) < limit:
+            _, title, slug = heapq.heappop(candidates)
+            if slug not in seen:
+                seen.add(slug)
+                ranked.append(Suggestion(title=title, slug=slug))
+        return ranked
+
+    def _precompute(self) -> dict[str, list[Suggestion]]:
+        """Rank every prefix wider than ``PRECOMPUTE_OVER`` keys.
+
+        Only a wide prefix can have wide extensions, so the walk descends
+        from single characters and stops at the first narrow one.
+        """
+        top = {}
+        wide = [("", 0, len(self._keys))]
+        while wide:
+            prefix, start, end = wide.pop()
+            length = len(prefix) + 1
+            i = start
+            while i < end:
+                if len(self._keys[i]) < length:
+                    # The key equals ``prefix``; it sorts before its extensions
+                    i += 1
+                    continue
+                child = self._keys[i][:length]
+                _, child_end = self._range(child, i, end)
+                if child_end - i > PRECOMPUTE_OVER:
+                    top[child] = self._rank(i, child_end, MAX_SUGGESTIONS)
+                    wide.append((child, i, child_end))
+                i = child_end
+        return top
+
+    def lookup(self, prefix: str, limit: int) -> list[Suggestion]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self._top:
+            return self._top[prefix][:limit]
+        return self._rank(*self._range(prefix), limit)
+
+
+class SuggestIndex:
+    """A ``PrefixIndex`` per suggestion kind, loaded from the catalog."""
+
+    def __init__(self, indexes: dict[str, PrefixIndex]) -> None:
+        self.indexes = indexes
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "SuggestIndex":
+        result = await db.execute(
+            select(Website.title, Website.slug, Website.view_count)
+            .where(Website.is_active.is_(True))
+        )
+        # Sorting the whole catalog takes a while; keep the event loop free
+        indexes = {"websites": await asyncio.to_thread(PrefixIndex, result.all())}
+        for name, model in TAXONOMIES.items():
+            result = await db.execute(
+                select(model.title, model.slug, model.website_count)
+                .where(model.is_active.is_(True), model.website_count > 0)
+            )
+            indexes[name] = PrefixIndex(result.all())
+        return cls(indexes)
+
+    def suggest(self, prefix: str, limit: int) -> Suggestions:
+        return Suggestions(
+            **{name: index.lookup(prefix, limit) for name, index in self.indexes.items()}
+        )
+
+
+_index: SuggestIndex | None = None
+_rebuild: asyncio.Event | None = None
+_first_build = asyncio.Lock()
+
+
+async def get_suggest_index(db: AsyncSession) -> SuggestIndex:
+    """The current index, without waiting for any rebuild.
+
+    Only a worker that has no index yet builds one here, on ``db``, which
+    should be a primary session so it sees every committed write.
+    """
+    global _index
+    if _index is None:
+        async with _first_build:
+            if _index is None:
+                _index = await SuggestIndex.load(db)
+    return _index
+
+
+def reset_suggest_index() -> None:
+    """Drop the index so the next lookup builds a fresh one."""
+    global _index, _first_build
+    _index = None
+    _first_build = asyncio.Lock()
+
+
+def _on_invalidate(tags: list[str]) -> None:
+    if _rebuild is not None and SUGGEST_TAGS.intersection(tags):
+        _rebuild.set()
+
+
+add_invalidation_listener(_on_invalidate)
+
+
+async def run_suggest_indexer() -> None:
+    """Build the index on startup, then rebuild it after writes and as it ages."""
+    global _index, _rebuild
+    _rebuild = asyncio.Event()
+    try:
+        while True:
+            _rebuild.clear()
+            try:
+                _index = await run_in_session(SuggestIndex.load)
+            except Exception:
+                logger.exception("Suggest index rebuild failed; serving the previous one")
+            try:
+                await asyncio.wait_for(
+                    _rebuild.wait(), settings.suggest_index_max_age_seconds
+                )
+            except TimeoutError:
+                pass
+    finally:
+        _rebuild = None
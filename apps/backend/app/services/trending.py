@@ -0,0 +1,180 @@
+"""Trending websites from exponentially decayed daily view counts.
+
+Every view flush adds its counts to a Redis hash per UTC day
+(``views:day:2026-01-31``, website id -> views), which expires once it
+leaves the ``trending_window_days`` window. A background worker reads the
+window into one days x websites matrix and scores every website at once:
+
+    score = sum over days of views * 0.5 ** (age in days / half life)
+
+The ``trending_size`` best are stored in a sorted set that
+``/websites/trending`` pages through. One worker computes at a time,
+every ``trending_refresh_interval_seconds``. Until the first run, the
+endpoint serves the popular list instead.
+"""
+
+import asyncio
+import logging
+import secrets
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import redis.asyncio as redis
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LOCK_PREFIX, get_redis, release_lock
+from app.core.config import settings
+from app.crud.website import crud_website
+from app.services.popular import popular_page
+
+logger = logging.getLogger(__name__)
+
+DAY_PREFIX = "views:day:"
+TRENDING_KEY = "trending:all"
+TRENDING_LOCK = f"{LOCK_PREFIX}trending"
+
+
+def day_key(day: date) -> str:
+    return f"{DAY_PREFIX}{day.isoformat()}"
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def add_daily_views(r: redis.Redis, views: Mapping[int, int]) -> None:
+    """Add flushed views (keyed by website id) to today's bucket."""
+    today = _today()
+    key = day_key(today)
+    # Kept one day past the window so the oldest bucket is whole when read
+    expire = timedelta(days=settings.trending_window_days + 1)
+    async with r.pipeline(transaction=False) as pipe:
+        for website_id, count in views.items():
+            pipe.hincrby(key, str(website_id), count)
+        pipe.expire(key, expire)
+        await pipe.execute()
+
+
+def trending_scores(
+    buckets: list[tuple[np.ndarray, np.ndarray]], half_life_days: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Decayed scores from daily buckets, newest day first.
+
+    Each bucket is a pair of equal-length arrays: website ids and their
+    views that day. Returns the distinct ids and their scores.
+    """
+    if not buckets:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    ids = np.concatenate([bucket_ids for bucket_ids, _ in buckets])
+    counts = np.concatenate([bucket_counts for _, bucket_counts in buckets])
+    ages = np.repeat(np.arange(len(buckets)), [bucket_ids.size for bucket_ids, _ in buckets])
+
+    websites, columns = np.unique(ids, return_inverse=True)
+    matrix = np.zeros((len(buckets), websites.size), dtype=np.float64)
+    # Hash fields are unique, so no cell is written twice
+    matrix[ages, columns] = counts
+    weights = 0.5 ** (np.arange(len(buckets)) / half_life_days)
+    return websites, weights @ matrix
+
+
+def top_scores(
+    ids: np.ndarray, scores: np.ndarray, size: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """The ``size`` best-scoring ids, best first; ties keep the newest id."""
+    if ids.size > size:
+        # Keep every tie at the cut, so the sort below settles who stays
+        cut = np.partition(scores, ids.size - size)[ids.size - size]
+        ids, scores = ids[scores >= cut], scores[scores >= cut]
+    order = np.lexsort((-ids, -scores))[:size]
+    return ids[order], scores[order]
+
+
+def parse_buckets(raw: list[dict[bytes, bytes]]) -> list[tuple[np.ndarray, np.ndarray]]:
+    """``HGETALL`` replies of day buckets as (ids, views) array pairs."""
+    return [
+        (
+            np.fromiter(map(int, bucket.keys()), dtype=np.int64, count=len(bucket)),
+            np.fromiter(map(int, bucket.values()), dtype=np.float64, count=len(bucket)),
+        )
+        for bucket in raw
+    ]
+
+
+def _best(raw: list[dict[bytes, bytes]]) -> tuple[np.ndarray, np.ndarray]:
+    ids, scores = trending_scores(parse_buckets(raw), settings.trending_half_life_days)
+    return top_scores(ids, scores, settings.trending_size)
+
+
+async def refresh_trending(r: redis.Redis) -> int:
+    """Recompute every score and store the best; returns how many."""
+    today = _today()
+    async with r.pipeline(transaction=False) as pipe:
+        for age in range(settings.trending_window_days):
+            pipe.hgetall(day_key(today - timedelta(days=age)))
+        raw = await pipe.execute()
+    # Seconds of CPU on a large catalog; keep it off the event loop
+    ids, scores = await asyncio.to_thread(_best, raw)
+    building = f"{TRENDING_KEY}:{secrets.token_hex(4)}"
+    async with r.pipeline(transaction=True) as pipe:
+        if ids.size:
+            # Zero-padded like the popular lists, so equal scores order by id
+            pipe.zadd(building, {
+                f"{website_id:012d}": score
+                for website_id, score in zip(ids.tolist(), scores.tolist())
+            })
+            pipe.rename(building, TRENDING_KEY)
+        else:
+            pipe.delete(TRENDING_KEY)
+        await pipe.execute()
+    return int(ids.size)
+
+
+async def trending_page(db: AsyncSession, *, offset: int = 0, limit: int = 20) -> list[Row]:
+    """List rows of the top trending websites.
+
+    Popular websites stand in until trending has been computed, or while
+    Redis is unreachable.
+    """
+    try:
+        r = await get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.exists(TRENDING_KEY)
+            pipe.zrevrange(TRENDING_KEY, offset, offset + limit - 1)
+            computed, members = await pipe.execute()
+    except redis.RedisError:
+        logger.warning("Trending list unavailable; serving popular")
+        computed = False
+    if not computed:
+        return await popular_page(db, offset=offset, limit=limit)
+    return await crud_website.get_by_ids(db, [int(member) for member in members])
+
+
+async def refresh_exclusively() -> None:
+    """Recompute trending unless another worker is already doing it."""
+    token = secrets.token_hex(8)
+    try:
+        r = await get_redis()
+        acquired = await r.set(
+            TRENDING_LOCK, token, nx=True, ex=settings.trending_lock_seconds
+        )
+        if not acquired:
+            return
+        try:
+            count = await refresh_trending(r)
+            logger.info("Scored trending websites; kept %d", count)
+        finally:
+            await release_lock(r, TRENDING_LOCK, token)
+    except redis.RedisError:
+        logger.warning("Trending refresh skipped: Redis unavailable")
+
+
+async def run_trending_refresher() -> None:
+    """Recompute trending on startup and every refresh interval."""
+    while True:
+        try:
+            await refresh_exclusively()
+        except Exception:
+            logger.exception("Trending refresh failed")
+        await asyncio.sleep(settings.trending_refresh_interval_seconds)
@@ -0,0 +1,100 @@
+"""Buffered view counting.
+
+Detail requests only bump a counter in the ``views:pending`` Redis hash, so a
+page view is never a database write. A background task drains the hash every
+``view_flush_interval_seconds`` and applies all counts in one bulk UPDATE.
+
+At most one flush interval of views is lost if a worker dies: counts held
+in-process while Redis is unreachable, or a batch drained but not committed.
+``view_count`` (and ``/websites/popular``) trails real traffic by about the
+same interval. Each flush also bumps the ranked popular lists and today's
+trending bucket.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.crud.website import crud_website
+from app.database import run_in_session
+from app.services.popular import add_popular_views
+from app.services.trending import add_daily_views
+
+logger = logging.getLogger(__name__)
+
+VIEWS_KEY = "views:pending"
+
+# Counts that could not reach Redis, or whose flush failed, retried next flush
+_local_views: Counter[str] = Counter()
+
+
+async def record_view(slug: str) -> None:
+    try:
+        r = await get_redis()
+        await r.hincrby(VIEWS_KEY, slug, 1)
+    except redis.RedisError:
+        _local_views[slug] += 1
+
+
+async def _drain() -> Counter[str]:
+    views = Counter(_local_views)
+    _local_views.clear()
+    try:
+        r = await get_redis()
+        # Read and clear atomically so concurrent flushers never double count
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hgetall(VIEWS_KEY)
+            pipe.delete(VIEWS_KEY)
+            pending, _ = await pipe.execute()
+    except redis.RedisError:
+        logger.warning("View flush could not reach Redis; flushing local counts only")
+    else:
+        views.update({slug.decode(): int(count) for slug, count in pending.items()})
+    return views
+
+
+async def flush_views(db: AsyncSession) -> int:
+    """Write every pending view to the database; returns the number applied."""
+    views = await _drain()
+    if not views:
+        return 0
+    try:
+        await crud_website.add_views(db, views)
+        await db.commit()
+    except Exception:
+        _local_views.update(views)
+        raise
+    by_id = {
+        website_id: views[slug]
+        for slug, website_id in (await crud_website.get_ids_by_slug(db, views)).items()
+    }
+    try:
+        r = await get_redis()
+        await add_popular_views(db, r, by_id)
+        await add_daily_views(r, by_id)
+    except redis.RedisError:
+        # Already counted in the database; the next list rebuild catches up
+        logger.warning("Popular and trending lists missed %d views", views.total())
+    return views.total()
+
+
+async def run_view_flusher() -> None:
+    """Flush periodically, and once more on shutdown."""
+    try:
+        while True:
+            await asyncio.sleep(settings.view_flush_interval_seconds)
+            try:
+                await run_in_session(flush_views)
+            except Exception:
+                # Never let a bad flush take the app's background tasks down
+                logger.exception("View flush failed; counts kept for the next run")
+    finally:
+        try:
+            await run_in_session(flush_views)
+        except Exception:
+            logger.exception("Final view flush failed; %d views lost", _local_views.total())
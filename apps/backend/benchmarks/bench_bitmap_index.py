@@ -0,0 +1,83 @@
+"""Time the bitmap index on a synthetic catalog of 300k websites.
+
+Builds the index straight from random arrays (no database): 200 categories,
+100 styles, 50 collections and 20 platforms, with a few tags per website.
+Reports a filtered page with its total and the facet counts for the same
+filter; only the row fetch for the page is left to SQL.
+
+Run from apps/backend:
+
+    python -m benchmarks.bench_bitmap_index
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.schemas.website import WebsiteFilter
+from app.services.bitmap_index import BitmapIndex, Taxonomy
+
+WEBSITES = 300_000
+
+# Taxonomy -> (values, tags per website)
+SHAPE = {"category": (200, 3), "style": (100, 2), "collection": (50, 1), "platform": (20, 1)}
+
+FILTERS = {
+    "none": WebsiteFilter(),
+    "category": WebsiteFilter(category=["v-3"]),
+    "any of 3": WebsiteFilter(category=["v-3", "v-4", "v-5"], featured=False),
+    "all of 2": WebsiteFilter(category=["v-3"], style=["v-1", "v-2"], match="all"),
+}
+
+
+def build(rng: np.random.Generator) -> BitmapIndex:
+    taxonomies = {}
+    for name, (count, per_website) in SHAPE.items():
+        values = [
+            SimpleNamespace(id=i + 1, slug=f"v-{i}", title=f"{name} {i}", is_active=True)
+            for i in range(count)
+        ]
+        positions = np.repeat(np.arange(WEBSITES), per_website)
+        # Skewed, like real tagging: a few values hold most websites
+        value_ids = np.minimum(rng.zipf(1.3, positions.size), count)
+        taxonomies[name] = Taxonomy(values, positions, value_ids, WEBSITES)
+
+    ids = np.arange(WEBSITES, 0, -1, dtype=np.int64)
+    created_at = np.sort(rng.integers(0, 10**15, WEBSITES))[::-1].copy()
+    orders = {sort: rng.permutation(WEBSITES) for sort in ("popular", "alpha")}
+    featured = rng.random(WEBSITES) < 0.1
+    return BitmapIndex(ids, created_at, featured, orders, taxonomies)
+
+
+def measure(func, number: int = 200) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e3
+
+
+def main() -> None:
+    start = time.perf_counter()
+    index = build(np.random.default_rng(42))
+    print(f"{WEBSITES} websites, built in {time.perf_counter() - start:.2f} s")
+    for label, website_filter in FILTERS.items():
+        page_ms = measure(lambda: index.page(website_filter, offset=40))
+        popular_ms = measure(lambda: index.page(website_filter, sort="popular"))
+        facets_ms = measure(lambda: index.facets(website_filter))
+        total = index.page(website_filter)[1]
+        print(
+            f"{label:>9} | {total:7d} matches | page {page_ms:6.3f} ms | "
+            f"popular {popular_ms:6.3f} ms | facets {facets_ms:6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
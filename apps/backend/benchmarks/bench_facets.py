@@ -0,0 +1,64 @@
+"""Compare facet counting against the plain page query it accompanies.
+
+Facets for all four taxonomies come from one UNION ALL grouped over the
+filtered ids; the page is the usual newest-first listing with its total.
+Uses the same in-memory SQLite catalog as ``bench_list_queries``.
+
+Run from apps/backend:
+
+    python -m benchmarks.bench_facets
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.crud.website import crud_website
+from app.database import Base
+from app.models import Category, Website
+from benchmarks.bench_list_queries import WEBSITES, seed
+
+ACTIVE = [Website.is_active.is_(True)]
+IN_CATEGORY = [*ACTIVE, Website.categories.any(Category.slug == "c-3")]
+
+
+async def measure(session_factory, loader, number: int = 50) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(number):
+            async with session_factory() as db:
+                await loader(db)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e3
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await seed(session_factory)
+
+    print(f"{WEBSITES} websites")
+    for label, filters in (("all", ACTIVE), ("category", IN_CATEGORY)):
+        page_ms = await measure(
+            session_factory, lambda db: crud_website.get_page(db, filters=filters)
+        )
+        facets_ms = await measure(
+            session_factory, lambda db: crud_website.facet_counts(db, filters=filters)
+        )
+        print(
+            f"{label:>9} | page {page_ms:6.2f} ms | facets {facets_ms:6.2f} ms | "
+            f"{facets_ms / page_ms:4.1f}x"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""Compare a listing page loaded as full ORM graphs against the lean projection.
+
+Old path: ``select(Website)`` with four ``selectinload`` relations, hydrated
+into ORM objects and validated against ``WebsiteListItem``.
+New path: only the ``LIST_COLUMNS`` rows ``WebsiteListItem`` renders.
+
+Both run against an in-memory SQLite database seeded with websites that each
+carry a platform, categories, styles and collections. Round trips to
+PostgreSQL make the query-count difference matter more than it does here.
+
+Run from apps/backend:
+
+    python -m benchmarks.bench_list_queries
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.crud.website import crud_website
+from app.database import Base
+from app.models import Category, Collection, Platform, Style, Website
+from app.schemas.website import WebsiteListItem
+
+list_adapter = TypeAdapter(list[WebsiteListItem])
+
+WEBSITES = 2_000
+TAXONOMY_SIZE = 20
+
+
+async def seed(session_factory: async_sessionmaker) -> None:
+    async with session_factory() as db:
+        platforms = [Platform(title=f"P{i}", slug=f"p-{i}") for i in range(5)]
+        categories = [Category(title=f"C{i}", slug=f"c-{i}") for i in range(TAXONOMY_SIZE)]
+        styles = [Style(title=f"S{i}", slug=f"s-{i}") for i in range(TAXONOMY_SIZE)]
+        collections = [
+            Collection(title=f"K{i}", slug=f"k-{i}") for i in range(TAXONOMY_SIZE)
+        ]
+        db.add_all(platforms + categories + styles + collections)
+        for i in range(WEBSITES):
+            db.add(Website(
+                slug=f"website-{i}",
+                title=f"Website {i}",
+                description="A carefully crafted landing page with bold typography",
+                original_url=f"https://example-{i}.com",
+                thumbnail_url=f"https://cdn.example.com/thumbs/{i}.webp",
+                platform=platforms[i % len(platforms)],
+                categories=[categories[i % TAXONOMY_SIZE], categories[(i + 7) % TAXONOMY_SIZE]],
+                styles=[styles[i % TAXONOMY_SIZE]],
+                collections=[collections[i % TAXONOMY_SIZE]],
+            ))
+        await db.commit()
+
+
+async def old_page(db, size: int) -> bytes:
+    stmt = (
+        crud_website._base_query()
+        .where(Website.is_active.is_(True))
+        .order_by(Website.created_at.desc())
+        .limit(size)
+    )
+    items = list((await db.execute(stmt)).scalars().unique().all())
+    return list_adapter.dump_json(list_adapter.validate_python(items, from_attributes=True))
+
+
+async def new_page(db, size: int) -> bytes:
+    items = await crud_website.get_multi(
+        db, limit=size, filters=[Website.is_active.is_(True)]
+    )
+    return list_adapter.dump_json(list_adapter.validate_python(items, from_attributes=True))
+
+
+async def measure(session_factory, engine, loader, size: int, number: int) -> tuple[float, int]:
+    queries = 0
+
+    def count(*args) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(number):
+                async with session_factory() as db:
+                    await loader(db, size)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return best / number * 1e3, queries // (5 * number)
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await seed(session_factory)
+
+    for size in (20, 100):
+        old_ms, old_queries = await measure(session_factory, engine, old_page, size, 50)
+        new_ms, new_queries = await measure(session_factory, engine, new_page, size, 50)
+        print(
+            f"{size:>4} items | old {old_ms:6.2f} ms, {old_queries} queries | "
+            f"new {new_ms:6.2f} ms, {new_queries} query | {old_ms / new_ms:5.1f}x"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
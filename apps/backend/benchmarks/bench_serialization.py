@@ -0,0 +1,81 @@
+"""Compare the per-request cost of a cache hit before and after caching encoded bodies.
+
+Old path: the cached JSON string is parsed and pushed back through the
+``PaginatedResponse[WebsiteListItem]`` response model on every hit.
+New path: the stored bytes are split from their header and sent as-is.
+
+Run from apps/backend:
+
+    python -m benchmarks.bench_serialization
+"""
+
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.cache import _decode, _encode, _make_entry
+from app.schemas.common import PaginatedResponse
+from app.schemas.website import WebsiteListItem
+
+page_adapter = TypeAdapter(PaginatedResponse[WebsiteListItem])
+
+
+def make_page(size: int) -> PaginatedResponse[WebsiteListItem]:
+    items = [
+        WebsiteListItem(
+            id=i,
+            slug=f"website-{i}",
+            title=f"Website {i}",
+            description="A carefully crafted landing page with bold typography " * 3,
+            original_url=f"https://example-{i}.com",
+            thumbnail_url=f"https://cdn.example.com/thumbs/{i}.webp",
+            image_url=f"https://cdn.example.com/images/{i}.webp",
+            is_featured=i % 5 == 0,
+            view_count=i * 17,
+            created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        for i in range(size)
+    ]
+    return PaginatedResponse[WebsiteListItem](
+        items=items, total=10_000, page=1, size=size, pages=10_000 // size
+    )
+
+
+def old_hit(cached: str) -> Response:
+    data = json.loads(cached)
+    model = page_adapter.validate_python(data)
+    return JSONResponse(page_adapter.dump_python(model, mode="json"))
+
+
+def new_hit(cached: bytes) -> Response:
+    entry = _decode(cached)
+    return Response(entry.body, media_type="application/json")
+
+
+def run(size: int, number: int = 2_000) -> None:
+    page = make_page(size)
+    old_cached = json.dumps(page.model_dump(mode="json"))
+    body = page_adapter.dump_json(page)
+    new_cached = _encode(_make_entry(body, None))
+
+    old = min(timeit.repeat(lambda: old_hit(old_cached), number=number, repeat=5))
+    new = min(timeit.repeat(lambda: new_hit(new_cached), number=number, repeat=5))
+    old_us = old / number * 1e6
+    new_us = new / number * 1e6
+    compressed = len(_make_entry(body, None).body)
+    print(
+        f"{size:>4} items | old {old_us:8.1f} us | new {new_us:6.1f} us | "
+        f"{old_us / new_us:6.1f}x | body {len(body):>6} B, stored {compressed:>6} B"
+    )
+
+
+if __name__ == "__main__":
+    for size in (20, 100):
+        run(size)
@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.database import Base, async_session, engine
-from app.models import Category, User, Website
+from app.models import Category, User, Website, reconcile_website_counts
 from app.models.website import website_categories
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -111,18 +111,10 @@ async def import_websites(
     await db.commit()
     print(f"  Imported {imported} websites ({skipped} skipped)")
 
-    # Update category website_count
-    from sqlalchemy import func
-
-    for slug, cat_id in category_map.items():
-        cat = await db.get(Category, cat_id)
-        if cat:
-            count = (await db.execute(
-                select(func.count()).where(website_categories.c.category_id == cat_id)
-            )).scalar_one()
-            cat.website_count = count
+    # Category links were bulk-inserted past the ORM counter hooks
+    await reconcile_website_counts(db)
     await db.commit()
-    print("  Updated category counts")
+    print("  Updated website counts")
 
 
 async def create_admin(db: AsyncSession) -> None:
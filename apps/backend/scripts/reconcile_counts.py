@@ -0,0 +1,26 @@
+"""Recompute website_count on every taxonomy, e.g. after bulk SQL edits."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import async_session, engine
+from app.models import reconcile_website_counts
+
+
+async def main() -> None:
+    print("Reconciling website counts...")
+    async with async_session() as db:
+        corrected = await reconcile_website_counts(db)
+        await db.commit()
+    for table, rows in corrected.items():
+        print(f"  {table}: {rows} corrected")
+
+    await engine.dispose()
+    print("Done!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""Pre-populate the response cache, e.g. right after a deploy or a purge."""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.cache import close_redis
+from app.core.config import settings
+from app.database import engine
+from app.main import app
+from app.services.cache_warmup import warm_cache
+
+
+async def main(pages: int, concurrency: int) -> None:
+    print("Warming cache...")
+    warmed = await warm_cache(app, pages=pages, concurrency=concurrency)
+    print(f"  Warmed {warmed} routes")
+
+    await close_redis()
+    await engine.dispose()
+    print("Done!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the UILove response cache")
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=settings.cache_warmup_pages,
+        help="Number of /websites pages to warm",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.cache_warmup_concurrency,
+        help="Maximum routes warmed at once",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(pages=args.pages, concurrency=args.concurrency))
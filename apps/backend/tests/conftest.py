@@ -1,18 +1,22 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
 from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from fakeredis.aioredis import FakeRedis
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import selectinload
 from sqlalchemy.pool import StaticPool
 
+from app.core.cache import local_cache
 from app.core.security import create_access_token, get_password_hash
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
 from app.main import app
 from app.models import Category, Collection, Platform, Style, User, Website
+from app.services.suggest import reset_suggest_index
 
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -31,6 +35,21 @@ def set_sqlite_pragma(dbapi_connection: Any, connection_record: Any) -> None:
     cursor.close()
 
 
+@contextmanager
+def capture_sql() -> Iterator[list[tuple[str, Any]]]:
+    """Record each (statement, parameters) the test engine sends meanwhile."""
+    statements: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
 async_session_test = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -58,27 +77,32 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
 
-async def async_empty_generator():
-    """Empty async generator for mocking scan_iter."""
-    return
-    yield  # Make it an async generator
+@pytest.fixture(scope="function")
+async def redis_client() -> AsyncGenerator[FakeRedis, None]:
+    client = FakeRedis()
+    yield client
+    await client.aclose()
 
 
 @pytest.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    db_session: AsyncSession, redis_client: FakeRedis
+) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    local_cache.clear()
+    reset_suggest_index()
 
-    # Mock Redis functions
+    # Route Redis calls to an in-memory fake
     with patch("app.core.cache.get_redis", new_callable=AsyncMock) as mock_redis:
-        mock_redis_client = AsyncMock()
-        mock_redis_client.get = AsyncMock(return_value=None)
-        mock_redis_client.set = AsyncMock()
-        mock_redis_client.delete = AsyncMock()
-        mock_redis_client.scan_iter = lambda **kwargs: async_empty_generator()
-        mock_redis_client.close = AsyncMock()
-        mock_redis.return_value = mock_redis_client
-
-        with patch("app.core.cache.close_redis", new_callable=AsyncMock):
+        mock_redis.return_value = redis_client
+
+        with (
+            patch("app.core.cache.close_redis", new_callable=AsyncMock),
+            patch("app.services.view_counter.get_redis", mock_redis),
+            patch("app.services.popular.get_redis", mock_redis),
+            patch("app.services.trending.get_redis", mock_redis),
+        ):
             async with AsyncClient(
                 transport=ASGITransport(app=app),
                 base_url="http://test",
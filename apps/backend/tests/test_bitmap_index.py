@@ -0,0 +1,219 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.website import crud_website
+from app.models import (
+    Category,
+    Collection,
+    Platform,
+    Style,
+    Website,
+    website_categories,
+    website_collections,
+    website_styles,
+)
+from app.schemas.website import WebsiteFilter
+from app.services import bitmap_index
+from app.services.bitmap_index import BitmapIndex
+
+
+@pytest.fixture
+async def catalog(db_session: AsyncSession) -> None:
+    """Sixty websites tagged at random, with tied timestamps and views."""
+    rng = random.Random(7)
+    taxonomies = {}
+    for model, slugs in (
+        (Category, ["landing", "portfolio", "saas"]),
+        (Style, ["minimal", "bold"]),
+        (Collection, ["picks"]),
+        (Platform, ["webflow", "framer"]),
+    ):
+        values = [model(slug=slug, title=slug.title()) for slug in slugs]
+        taxonomies[model] = values
+        db_session.add_all(values)
+    taxonomies[Category].append(Category(slug="hidden", title="Hidden", is_active=False))
+    db_session.add(taxonomies[Category][-1])
+    await db_session.flush()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    websites = [
+        Website(
+            slug=f"site-{i}",
+            title=rng.choice(["Alpha", "Beta", "Gamma"]) + f" {i % 7}",
+            platform_id=rng.choice([None, *[p.id for p in taxonomies[Platform]]]),
+            is_featured=rng.random() < 0.3,
+            is_active=i % 11 != 0,
+            view_count=rng.randrange(5),
+            created_at=now - timedelta(hours=i // 3),
+        )
+        for i in range(60)
+    ]
+    db_session.add_all(websites)
+    await db_session.flush()
+
+    for junction, column, model in (
+        (website_categories, "category_id", Category),
+        (website_styles, "style_id", Style),
+        (website_collections, "collection_id", Collection),
+    ):
+        rows = [
+            {"website_id": website.id, column: value.id}
+            for website in websites
+            for value in taxonomies[model]
+            if rng.random() < 0.4
+        ]
+        await db_session.execute(insert(junction), rows)
+    await db_session.commit()
+
+
+FILTERS = [
+    WebsiteFilter(),
+    WebsiteFilter(category=["landing"]),
+    WebsiteFilter(category=["landing", "saas"]),
+    WebsiteFilter(category=["landing", "saas"], match="all"),
+    WebsiteFilter(category=["landing", "missing"], match="all"),
+    WebsiteFilter(category=["missing"]),
+    WebsiteFilter(category=["hidden"], style=["bold"]),
+    WebsiteFilter(style=["minimal", "bold"], collection=["picks"], match="all"),
+    WebsiteFilter(platform=["webflow", "framer"], match="all"),
+    WebsiteFilter(platform=["framer"], featured=True),
+    WebsiteFilter(featured=False, style=["minimal"]),
+]
+
+
+def date_filters(now: datetime) -> list[WebsiteFilter]:
+    return [
+        WebsiteFilter(created_after=now - timedelta(hours=5)),
+        WebsiteFilter(created_before=now - timedelta(hours=5), category=["portfolio"]),
+        WebsiteFilter(
+            created_after=now - timedelta(hours=12),
+            created_before=now - timedelta(hours=3, minutes=30),
+        ),
+    ]
+
+
+class TestMatchesSql:
+    async def test_pages_and_totals(self, db_session: AsyncSession, catalog: None) -> None:
+        index = await BitmapIndex.load(db_session)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+
+        for website_filter in FILTERS + date_filters(now):
+            for sort in ("newest", "popular", "alpha"):
+                for offset in (0, 7):
+                    rows, total = await crud_website.get_filtered(
+                        db_session, website_filter, sort=sort, offset=offset, limit=7
+                    )
+                    ids, bitmap_total = index.page(
+                        website_filter, sort=sort, offset=offset, limit=7
+                    )
+                    assert ids == [row.id for row in rows], (website_filter, sort)
+                    assert bitmap_total == total
+
+    async def test_cursor_pages(self, db_session: AsyncSession, catalog: None) -> None:
+        index = await BitmapIndex.load(db_session)
+        website_filter = WebsiteFilter(style=["minimal"])
+        rows, _ = await crud_website.get_filtered(db_session, website_filter, limit=4)
+        while rows:
+            after = (rows[-1].created_at, rows[-1].id)
+            rows, _ = await crud_website.get_filtered(
+                db_session, website_filter, limit=4, after=after
+            )
+            ids, _ = index.page(website_filter, limit=4, after=after)
+            assert ids == [row.id for row in rows]
+
+    async def test_facets(self, db_session: AsyncSession, catalog: None) -> None:
+        index = await BitmapIndex.load(db_session)
+        for website_filter in FILTERS:
+            facets = await crud_website.facet_counts(
+                db_session, filters=crud_website.filter_clauses(website_filter)
+            )
+            expected = {
+                name: [{"slug": r.slug, "title": r.title, "count": r.count} for r in rows]
+                for name, rows in facets.items()
+            }
+            assert index.facets(website_filter) == expected
+
+
+class TestListingEndpoint:
+    async def test_serves_listings_from_the_index(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        catalog: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        params = {"category": ["landing", "saas"], "match": "all", "facets": True, "size": 5}
+        expected = (await client.get("/api/v1/websites", params=params)).json()
+
+        monkeypatch.setattr(bitmap_index, "_index", await BitmapIndex.load(db_session))
+
+        async def unused(*args, **kwargs):
+            raise AssertionError("listing queried SQL for ids")
+
+        monkeypatch.setattr(crud_website, "get_filtered", unused)
+        monkeypatch.setattr(crud_website, "facet_counts", unused)
+
+        # A different page size misses the cached response
+        response = await client.get("/api/v1/websites", params={**params, "size": 4})
+        data = response.json()
+        assert [item["slug"] for item in data["items"]] == [
+            item["slug"] for item in expected["items"][:4]
+        ]
+        assert data["total"] == expected["total"]
+        assert data["facets"] == expected["facets"]
+
+    async def test_writes_retire_the_index(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        admin_headers: dict[str, str],
+        catalog: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(bitmap_index, "_index", await BitmapIndex.load(db_session))
+
+        await client.put(
+            "/api/v1/websites/site-1", json={"is_active": False}, headers=admin_headers
+        )
+
+        assert bitmap_index.current_bitmap_index() is None
+        response = await client.get("/api/v1/websites", params={"size": 100})
+        assert "site-1" not in [item["slug"] for item in response.json()["items"]]
+
+
+class TestIndexer:
+    async def test_burst_of_writes_rebuilds_once(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "bitmap_index_debounce_seconds", 0.05)
+        builds = 0
+
+        async def build(load):
+            nonlocal builds
+            builds += 1
+            return SimpleNamespace(size=0)
+
+        monkeypatch.setattr(bitmap_index, "run_in_session", build)
+        indexer = asyncio.create_task(bitmap_index.run_bitmap_indexer())
+        try:
+            await asyncio.sleep(0.01)
+            assert builds == 1
+            for _ in range(3):
+                bitmap_index._on_invalidate(["websites"])
+                assert bitmap_index.current_bitmap_index() is None
+            await asyncio.sleep(0.1)
+            assert builds == 2
+            assert bitmap_index.current_bitmap_index() is not None
+        finally:
+            indexer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await indexer
+
@@ -0,0 +1,444 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fakeredis import FakeServer, FakeStrictRedis
+from fakeredis.aioredis import FakeRedis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import etag_matches
+from app.core.cache import (
+    GENERATION_PREFIX,
+    INVALIDATION_CHANNEL,
+    LOCK_PREFIX,
+    LocalCache,
+    add_invalidation_listener,
+    cache_get_or_set,
+    get_generations,
+    invalidate_tags,
+    listen_for_invalidations,
+    local_cache,
+    make_cache_key,
+    release_lock,
+    remove_invalidation_listener,
+    run_refresher,
+)
+from app.core.config import settings
+from app.models import Category, Style, Website
+
+
+class TestCacheKeys:
+    def test_make_cache_key_is_canonical(self) -> None:
+        first = make_cache_key("websites:list", size=20, page=1, category="minimal")
+        second = make_cache_key("websites:list", category="minimal", page=1, size=20)
+        assert first == second == "websites:list:category=minimal:page=1:size=20"
+
+    def test_make_cache_key_drops_none(self) -> None:
+        key = make_cache_key("websites:list", page=1, style=None)
+        assert key == "websites:list:page=1"
+
+
+class TestReadThroughCache:
+    async def test_list_served_from_cache(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+    ) -> None:
+        response = await client.get("/api/v1/websites")
+        assert response.json()["total"] == 5
+
+        db_session.add(Website(slug="uncached-site", title="Uncached Site"))
+        await db_session.commit()
+
+        response = await client.get("/api/v1/websites")
+        assert response.status_code == 200
+        assert response.json()["total"] == 5
+
+    async def test_write_invalidates_cached_lists(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_category: Category,
+        test_websites: list[Website],
+    ) -> None:
+        response = await client.get(f"/api/v1/categories/{test_category.slug}/websites")
+        assert response.json()["total"] == 5
+
+        response = await client.post(
+            "/api/v1/websites",
+            json={
+                "slug": "fresh-site",
+                "title": "Fresh Site",
+                "category_ids": [test_category.id],
+            },
+            headers=admin_headers,
+        )
+        assert response.status_code == 201
+
+        response = await client.get(f"/api/v1/categories/{test_category.slug}/websites")
+        assert response.json()["total"] == 6
+
+
+class TestTagInvalidation:
+    async def test_invalidate_tags_bumps_generations(
+        self, client: AsyncClient
+    ) -> None:
+        assert await get_generations(["websites", "category:minimal"]) == [0, 0]
+        await invalidate_tags(["category:minimal", "category:minimal"])
+        assert await get_generations(["websites", "category:minimal"]) == [0, 1]
+
+    async def test_local_invalidation_follows_the_bump(self) -> None:
+        # A sync client on the same fake server, since a listener cannot await
+        server = FakeServer()
+        seen = []
+
+        def listener(tags: list[str]) -> None:
+            seen.append(int(FakeStrictRedis(server=server).get(GENERATION_PREFIX + "websites")))
+
+        add_invalidation_listener(listener)
+        try:
+            with patch(
+                "app.core.cache.get_redis", AsyncMock(return_value=FakeRedis(server=server))
+            ):
+                await invalidate_tags(["websites"])
+        finally:
+            remove_invalidation_listener(listener)
+        assert seen == [1]
+
+    async def test_update_refreshes_cached_detail(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_website: Website,
+    ) -> None:
+        url = f"/api/v1/websites/{test_website.slug}"
+        assert (await client.get(url)).json()["title"] == "Example Site"
+
+        await client.put(url, json={"title": "Renamed"}, headers=admin_headers)
+
+        assert (await client.get(url)).json()["title"] == "Renamed"
+
+    async def test_write_keeps_unrelated_slices(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_website: Website,
+        test_style: Style,
+    ) -> None:
+        await client.get(f"/api/v1/styles/{test_style.slug}/websites")
+
+        await client.put(
+            f"/api/v1/websites/{test_website.slug}",
+            json={"title": "Renamed"},
+            headers=admin_headers,
+        )
+
+        assert await get_generations([f"style:{test_style.slug}"]) == [0]
+        assert await get_generations([f"website:{test_website.slug}"]) == [1]
+
+
+class TestLocalCache:
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LocalCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        assert cache.get("a") == 1
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entries_miss(self) -> None:
+        cache = LocalCache(max_entries=2)
+        cache.set("a", 1, ttl=0)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_invalidate_by_tag_and_stats(self) -> None:
+        cache = LocalCache(max_entries=10)
+        cache.set("a", 1, ttl=60, tags=["categories"])
+        cache.set("b", 2, ttl=60, tags=["styles"])
+        cache.invalidate(["categories"])
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.stats() == {
+            "size": 1,
+            "max_entries": 10,
+            "hits": 1,
+            "misses": 1,
+            "hit_ratio": 0.5,
+        }
+
+    async def test_published_invalidation_clears_local_entries(
+        self, client: AsyncClient, redis_client
+    ) -> None:
+        local_cache.set("categories:list", b"[]", ttl=60, tags=["categories"])
+        listener = asyncio.create_task(listen_for_invalidations())
+        await asyncio.sleep(0.05)
+
+        await redis_client.publish(INVALIDATION_CHANNEL, '["categories"]')
+        await asyncio.sleep(0.05)
+        listener.cancel()
+
+        assert local_cache.get("categories:list") is None
+
+    async def test_reference_list_served_locally(
+        self, client: AsyncClient, test_category: Category
+    ) -> None:
+        await client.get("/api/v1/categories")
+        response = await client.get("/api/v1/categories")
+        assert response.json()[0]["slug"] == test_category.slug
+        assert local_cache.stats()["hits"] == 1
+
+        response = await client.get("/health/cache")
+        assert response.json()["local"]["size"] == 1
+
+
+class TestSingleFlight:
+    async def test_concurrent_misses_share_one_load(
+        self, client: AsyncClient
+    ) -> None:
+        calls = 0
+
+        async def loader() -> bytes:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return b"[1]"
+
+        entries = await asyncio.gather(
+            *(cache_get_or_set("websites:featured", loader) for _ in range(10))
+        )
+
+        assert calls == 1
+        assert all(entry.body == b"[1]" for entry in entries)
+
+    async def test_waits_for_fill_by_another_worker(
+        self, client: AsyncClient, redis_client
+    ) -> None:
+        await redis_client.set(f"{LOCK_PREFIX}websites:latest", "other-worker")
+
+        async def fill_elsewhere() -> None:
+            await asyncio.sleep(0.1)
+            await redis_client.set("websites:latest", _stored(b'["remote"]'))
+
+        async def loader() -> bytes:
+            raise AssertionError("loader must not run while another worker fills")
+
+        filler = asyncio.create_task(fill_elsewhere())
+        entry = await cache_get_or_set("websites:latest", loader)
+        await filler
+
+        assert entry.body == b'["remote"]'
+
+    async def test_loads_itself_when_wait_budget_exceeded(
+        self, client: AsyncClient, redis_client, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "cache_lock_wait_ms", 100)
+        await redis_client.set(f"{LOCK_PREFIX}websites:popular", "stuck-worker")
+
+        async def loader() -> bytes:
+            return b'["local"]'
+
+        entry = await cache_get_or_set("websites:popular", loader)
+        assert entry.body == b'["local"]'
+
+    async def test_release_keeps_a_lock_taken_over_by_another_worker(
+        self, redis_client: FakeRedis
+    ) -> None:
+        lock_key = f"{LOCK_PREFIX}websites:latest"
+        # Ours expired and another worker took the lock in the meantime
+        await redis_client.set(lock_key, "other-worker")
+
+        assert not await release_lock(redis_client, lock_key, "ours")
+        assert await redis_client.get(lock_key) == b"other-worker"
+
+        assert await release_lock(redis_client, lock_key, "other-worker")
+        assert await redis_client.get(lock_key) is None
+
+
+class TestStaleWhileRevalidate:
+    async def test_stale_hit_served_and_refreshed_in_background(
+        self, client: AsyncClient, redis_client
+    ) -> None:
+        await redis_client.set(
+            "websites:popular", _stored(b'["stale"]', fresh_until=time.time() - 1)
+        )
+        refresher = asyncio.create_task(run_refresher())
+        await asyncio.sleep(0)
+
+        async def loader() -> bytes:
+            raise AssertionError("a stale hit must not load inline")
+
+        async def refresh() -> bytes:
+            return b'["fresh"]'
+
+        stale = await cache_get_or_set(
+            "websites:popular", loader, soft_ttl=60, refresh=refresh
+        )
+        await asyncio.sleep(0.05)
+        fresh = await cache_get_or_set(
+            "websites:popular", loader, soft_ttl=60, refresh=refresh
+        )
+        refresher.cancel()
+
+        assert stale.body == b'["stale"]'
+        assert fresh.body == b'["fresh"]'
+
+    async def test_fresh_hit_does_not_refresh(
+        self, client: AsyncClient, redis_client
+    ) -> None:
+        refresher = asyncio.create_task(run_refresher())
+        await asyncio.sleep(0)
+        calls = 0
+
+        async def load() -> bytes:
+            nonlocal calls
+            calls += 1
+            return b"[]"
+
+        for _ in range(3):
+            await cache_get_or_set("websites:featured", load, soft_ttl=60, refresh=load)
+        await asyncio.sleep(0.05)
+        refresher.cancel()
+
+        assert calls == 1
+
+
+class TestEncodedBodies:
+    async def test_large_bodies_are_compressed(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "cache_compress_min_bytes", 16)
+        body = b'{"items": []}' * 10
+
+        async def loader() -> bytes:
+            return body
+
+        entry = await cache_get_or_set("websites:list", loader)
+        assert entry.compressed
+        assert entry.decompressed() == body
+
+        cached = await cache_get_or_set("websites:list", loader)
+        assert cached == entry
+
+    async def test_compressed_hit_passed_through_to_client(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "cache_compress_min_bytes", 16)
+        await client.get("/api/v1/websites")
+
+        response = await client.get("/api/v1/websites")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["total"] == 5
+
+        response = await client.get(
+            "/api/v1/websites", headers={"Accept-Encoding": "identity"}
+        )
+        assert "content-encoding" not in response.headers
+        assert response.json()["total"] == 5
+
+
+class TestConditionalGet:
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/v1/websites",
+            "/api/v1/websites/example-site",
+            "/api/v1/categories/minimal/websites",
+            "/api/v1/categories",
+            "/api/v1/search?q=example",
+        ],
+    )
+    async def test_matching_etag_returns_304(
+        self, client: AsyncClient, test_website: Website, path: str
+    ) -> None:
+        response = await client.get(path)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        response = await client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    async def test_changed_content_gets_new_etag(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_website: Website,
+    ) -> None:
+        url = f"/api/v1/websites/{test_website.slug}"
+        etag = (await client.get(url)).headers["etag"]
+
+        await client.put(url, json={"title": "Renamed"}, headers=admin_headers)
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_etag_matches(self) -> None:
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"a"')
+
+
+class TestNegativeCache:
+    async def test_unknown_slug_cached_as_404(
+        self, client: AsyncClient, db_session: AsyncSession
+    ) -> None:
+        response = await client.get("/api/v1/websites/ghost-site")
+        assert response.status_code == 404
+
+        db_session.add(Website(slug="ghost-site", title="Ghost Site"))
+        await db_session.commit()
+
+        response = await client.get("/api/v1/websites/ghost-site")
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Website not found"}
+
+    async def test_unknown_category_cached_as_404(
+        self, client: AsyncClient, redis_client
+    ) -> None:
+        response = await client.get("/api/v1/categories/ghost/websites")
+        assert response.status_code == 404
+
+        keys = [key async for key in redis_client.scan_iter(match="websites:category:ghost*")]
+        assert len(keys) == 1
+        assert 0 < await redis_client.ttl(keys[0]) <= settings.cache_negative_ttl
+
+    async def test_create_clears_negative_entry(
+        self, client: AsyncClient, admin_headers: dict[str, str]
+    ) -> None:
+        response = await client.get("/api/v1/websites/new-site")
+        assert response.status_code == 404
+
+        response = await client.post(
+            "/api/v1/websites",
+            json={"slug": "new-site", "title": "New Site"},
+            headers=admin_headers,
+        )
+        assert response.status_code == 201
+
+        response = await client.get("/api/v1/websites/new-site")
+        assert response.status_code == 200
+        assert response.json()["view_count"] == 0
+
+
+def _stored(body: bytes, fresh_until: float | None = None) -> bytes:
+    header = json.dumps({
+        "etag": "test",
+        "fresh_until": fresh_until,
+        "compressed": False,
+        "status": 200,
+    })
+    return header.encode() + b"\n" + body
@@ -0,0 +1,39 @@
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import local_cache
+from app.main import app
+from app.models import Category, Collection, Style, Website
+from app.services.cache_warmup import warm_cache
+
+
+# The in-memory test database is a single shared connection, so warm-up
+# runs one route at a time here
+class TestCacheWarmup:
+    async def test_warms_listings_and_taxonomy_pages(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+        test_style: Style,
+        test_collection: Collection,
+    ) -> None:
+        warmed = await warm_cache(app, pages=2, concurrency=1)
+
+        # 4 reference lists, featured/latest/popular/trending, 2 pages, 3 taxonomy pages
+        assert warmed == 13
+
+        db_session.add(Website(slug="late-site", title="Late Site"))
+        await db_session.commit()
+
+        response = await client.get("/api/v1/websites?page=1")
+        assert response.json()["total"] == 5
+        response = await client.get(f"/api/v1/styles/{test_style.slug}/websites")
+        assert response.status_code == 200
+
+    async def test_reference_lists_land_in_local_cache(
+        self, client: AsyncClient, test_category: Category
+    ) -> None:
+        await warm_cache(app, pages=1, concurrency=1)
+
+        assert local_cache.get("categories:list") is not None
@@ -48,3 +48,19 @@ class TestCategoryWebsites:
         assert len(data["items"]) == 2
         assert data["total"] == 5
         assert data["pages"] == 3
+
+    async def test_get_websites_by_category_cursor(
+        self, client: AsyncClient, test_category: Category, test_websites: list[Website]
+    ) -> None:
+        url = f"/api/v1/categories/{test_category.slug}/websites"
+        first = (await client.get(url, params={"size": 3})).json()
+        assert first["next_cursor"] is not None
+
+        response = await client.get(
+            url, params={"size": 3, "cursor": first["next_cursor"]}
+        )
+        data = response.json()
+        assert len(data["items"]) == 2
+        assert data["next_cursor"] is None
+        seen = {item["slug"] for item in first["items"] + data["items"]}
+        assert len(seen) == 5
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+
+from app.core.cache import _invalidate_locally
+from app.core.config import settings
+from app.crud.website import crud_website
+from app.database import (
+    Base,
+    MeteredPool,
+    ReplicaRouter,
+    build_engine,
+    engine_options,
+    pool_stats,
+    read_session,
+)
+from app.models import Category, Website
+
+
+@pytest.fixture
+async def small_engine(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 1)
+    monkeypatch.setattr(settings, "db_pool_timeout", 0.1)
+    engine = build_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+class TestEngineSettings:
+    async def test_engine_uses_pool_settings(self, small_engine) -> None:
+        pool = small_engine.pool
+        assert isinstance(pool, MeteredPool)
+        assert pool.size() == 1
+        assert pool_stats(small_engine)["capacity"] == 2
+        assert small_engine.echo is False
+
+    def test_asyncpg_gets_server_tuning(self) -> None:
+        connect_args = engine_options("postgresql+asyncpg://u:p@localhost/db")["connect_args"]
+        assert connect_args["prepared_statement_cache_size"] == (
+            settings.db_prepared_statement_cache_size
+        )
+        assert connect_args["server_settings"] == {
+            "statement_timeout": str(settings.db_statement_timeout_ms)
+        }
+
+
+class TestPoolMetrics:
+    async def test_reports_checkouts_and_utilization(self, small_engine) -> None:
+        async with small_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = pool_stats(small_engine)
+            assert stats["checked_out"] == 1
+            assert stats["utilization"] == 0.5
+
+        stats = pool_stats(small_engine)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["wait_ms_max"] >= 0
+
+    async def test_counts_checkout_timeouts(self, small_engine) -> None:
+        async with small_engine.connect(), small_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with small_engine.connect():
+                    pass
+            stats = pool_stats(small_engine)
+            assert stats["utilization"] == 1.0
+
+        stats = pool_stats(small_engine)
+        assert stats["timeouts"] == 1
+        assert stats["wait_ms_max"] >= 100
+
+
+@pytest.fixture
+async def engines():
+    created = []
+
+    def make(url: str = "sqlite+aiosqlite:///:memory:"):
+        engine = build_engine(url)
+        created.append(engine)
+        return engine
+
+    yield make
+    for engine in created:
+        await engine.dispose()
+
+
+async def connected_engine(router: ReplicaRouter):
+    conn = await router.connect()
+    await conn.close()
+    return conn.engine
+
+
+class TestReplicaRouting:
+    async def test_without_replicas_reads_use_primary(self, engines) -> None:
+        primary = engines()
+        router = ReplicaRouter(primary, [], retry_after=30)
+        assert await connected_engine(router) is primary
+
+    async def test_round_robins_across_replicas(self, engines) -> None:
+        primary, first, second = engines(), engines(), engines()
+        router = ReplicaRouter(primary, [first, second], retry_after=30)
+        picked = [await connected_engine(router) for _ in range(4)]
+        assert picked == [first, second, first, second]
+
+    async def test_benches_unreachable_replica(self, engines) -> None:
+        primary, healthy = engines(), engines()
+        broken = engines("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+        router = ReplicaRouter(primary, [broken, healthy], retry_after=30)
+
+        picked = [await connected_engine(router) for _ in range(3)]
+        assert picked == [healthy, healthy, healthy]
+        assert [r["healthy"] for r in router.stats()] == [False, True]
+
+    async def test_falls_back_to_primary_when_all_replicas_down(self, engines) -> None:
+        primary = engines()
+        broken = engines("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+        router = ReplicaRouter(primary, [broken], retry_after=0)
+        assert await connected_engine(router) is primary
+        # With no bench time the replica is retried on the next read
+        assert router.is_healthy(broken)
+
+
+    async def test_writes_pin_reads_to_primary(
+        self, engines, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "db_replica_pin_seconds", 0.05)
+        primary, replica = engines(), engines()
+        router = ReplicaRouter(primary, [replica], retry_after=30)
+        monkeypatch.setattr("app.database.read_router", router)
+        assert await connected_engine(router) is replica
+
+        # Invalidation follows every write, in this worker or another
+        _invalidate_locally(["websites"])
+        assert await connected_engine(router) is primary
+
+        await asyncio.sleep(0.06)
+        assert await connected_engine(router) is replica
+
+@pytest.fixture
+async def replica(tmp_path, engines, monkeypatch: pytest.MonkeyPatch):
+    engine = engines(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(Category.__table__.insert().values(id=1, slug="saas", title="SaaS"))
+        await conn.execute(Website.__table__.insert().values(slug="site", title="Site"))
+        await conn.execute(text("INSERT INTO website_categories VALUES (1, 1)"))
+    monkeypatch.setattr("app.database.read_router", ReplicaRouter(engine, [], 30))
+    return engine
+
+
+class TestReadSession:
+    async def test_no_statement_no_checkout(self, replica) -> None:
+        before = pool_stats(replica)["checkouts"]
+        async with read_session():
+            pass
+        assert pool_stats(replica)["checkouts"] == before
+
+    async def test_one_checkout_per_session(self, replica) -> None:
+        before = pool_stats(replica)["checkouts"]
+        async with read_session() as db:
+            website = await crud_website.get_by_slug(db, "site")
+            assert not db.in_transaction()
+            count = await crud_website.count(db)
+            assert pool_stats(replica)["checked_out"] == 1
+
+        # Relationships loaded by that statement survive the release
+        assert [c.slug for c in website.categories] == ["saas"]
+        assert count == 1
+        assert pool_stats(replica)["checked_out"] == 0
+        assert pool_stats(replica)["checkouts"] == before + 1
+
+
+class TestDatabaseHealth:
+    async def test_db_health_reports_primary_pool(self, client: AsyncClient) -> None:
+        response = await client.get("/health/db")
+        assert response.status_code == 200
+        assert {"capacity", "checked_out", "utilization", "wait_ms_avg"} <= set(
+            response.json()["primary"]
+        )
+        assert response.json()["replicas"] == []
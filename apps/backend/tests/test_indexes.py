@@ -0,0 +1,112 @@
+"""EXPLAIN checks that each CRUDWebsite listing shape is served by an index.
+
+The statements are captured from the real CRUD calls, so a query change
+that stops matching its index fails here.
+"""
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.website import crud_website
+from app.models import Website
+from app.schemas.website import WebsiteFilter
+from tests.conftest import capture_sql
+
+
+async def query_plans(
+    db: AsyncSession, call: Callable[[], Awaitable[Any]]
+) -> list[str]:
+    with capture_sql() as statements:
+        await call()
+
+    conn = await db.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append(" | ".join(row[-1] for row in result))
+    return plans
+
+
+ACTIVE = [Website.is_active.is_(True)]
+
+
+@pytest.mark.parametrize(
+    ("call", "index"),
+    [
+        (lambda db: crud_website.get_multi(db, filters=ACTIVE), "ix_websites_active_created"),
+        (lambda db: crud_website.get_latest(db), "ix_websites_active_created"),
+        (
+            lambda db: crud_website.get_page(db, filters=ACTIVE, with_total=False),
+            "ix_websites_active_created",
+        ),
+        (lambda db: crud_website.get_popular(db), "ix_websites_active_popular"),
+        # Without table statistics SQLite cannot tell the featured index is
+        # the narrower one; either partial index still supplies the order
+        (lambda db: crud_website.get_featured(db), "ix_websites_"),
+    ],
+)
+async def test_sorted_listing_reads_index_in_order(
+    db_session: AsyncSession, call: Callable, index: str
+) -> None:
+    plans = await query_plans(db_session, lambda: call(db_session))
+    assert len(plans) == 1
+    assert f"USING INDEX {index}" in plans[0], plans[0]
+    assert "TEMP B-TREE" not in plans[0], plans[0]
+
+
+@pytest.mark.parametrize(
+    ("call", "index"),
+    [
+        (lambda db: crud_website.get_by_category(db, 1), "ix_website_categories_category_id"),
+        (lambda db: crud_website.get_by_category(db, 1, with_total=False), "ix_website_categories_category_id"),
+        (lambda db: crud_website.get_by_style(db, 1), "ix_website_styles_style_id"),
+        (lambda db: crud_website.get_by_style(db, 1, with_total=False), "ix_website_styles_style_id"),
+        (lambda db: crud_website.get_by_collection(db, 1), "ix_website_collections_collection_id"),
+        (lambda db: crud_website.get_by_collection(db, 1, with_total=False), "ix_website_collections_collection_id"),
+    ],
+)
+async def test_taxonomy_join_searches_reverse_index(
+    db_session: AsyncSession, call: Callable, index: str
+) -> None:
+    # An empty page also runs the fallback COUNT; it must use the index too
+    plans = await query_plans(db_session, lambda: call(db_session))
+    for plan in plans:
+        assert f"USING COVERING INDEX {index}" in plan, plan
+
+
+async def test_keyset_page_reads_index_in_order(db_session: AsyncSession) -> None:
+    after = (datetime(2026, 1, 1, tzinfo=timezone.utc), 10)
+    plans = await query_plans(
+        db_session, lambda: crud_website.get_multi(db_session, filters=ACTIVE, after=after)
+    )
+    assert "ix_websites_active_created" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+@pytest.mark.parametrize(
+    ("sort", "index"),
+    [
+        ("newest", "ix_websites_active_created"),
+        ("popular", "ix_websites_active_popular"),
+        ("alpha", "ix_websites_active_title"),
+    ],
+)
+async def test_filtered_listing_reads_sort_index(
+    db_session: AsyncSession, sort: str, index: str
+) -> None:
+    website_filter = WebsiteFilter(category=["minimal", "bold"], match="all")
+    plans = await query_plans(
+        db_session,
+        lambda: crud_website.get_filtered(
+            db_session, website_filter, sort=sort, with_total=False
+        ),
+    )
+    assert len(plans) == 1
+    assert f"USING INDEX {index}" in plans[0], plans[0]
+    assert "TEMP B-TREE" not in plans[0], plans[0]
+    # Each membership test probes the junction's primary key
+    assert plans[0].count("SEARCH website_categories USING COVERING INDEX sqlite_autoindex") == 2
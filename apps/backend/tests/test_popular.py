@@ -0,0 +1,149 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+from httpx import AsyncClient
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.website import crud_website
+from app.models import Category, Style, Website, website_styles
+from app.services.popular import (
+    KEYS_KEY,
+    popular_key,
+    rebuild_popular_lists,
+)
+from app.services.view_counter import VIEWS_KEY, flush_views
+
+
+def slugs(response) -> list[str]:
+    data = response.json()
+    items = data["items"] if isinstance(data, dict) else data
+    return [item["slug"] for item in items]
+
+
+async def set_views(db: AsyncSession, views: dict[str, int]) -> None:
+    table = Website.__table__
+    for slug, count in views.items():
+        await db.execute(update(table).where(table.c.slug == slug).values(view_count=count))
+    await db.commit()
+
+
+async def unused(*args, **kwargs):
+    raise AssertionError("ranked in SQL")
+
+
+class TestRebuild:
+    async def test_builds_global_and_taxonomy_lists(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_websites: list[Website],
+        test_category: Category,
+        test_style: Style,
+    ) -> None:
+        await db_session.execute(
+            insert(website_styles).values(website_id=test_websites[1].id, style_id=test_style.id)
+        )
+        await db_session.commit()
+
+        assert await rebuild_popular_lists(db_session) == 4
+        ranked = await redis_client.zrevrange(popular_key(), 0, -1, withscores=True)
+        assert [(int(member), score) for member, score in ranked] == [
+            (website.id, website.view_count) for website in reversed(test_websites)
+        ]
+        assert await redis_client.zcard(popular_key("category", test_category.id)) == 5
+        assert await redis_client.zcard(popular_key("style", test_style.id)) == 1
+
+    async def test_drops_inactive_websites_and_emptied_lists(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_website_with_style: Website,
+        test_style: Style,
+    ) -> None:
+        await rebuild_popular_lists(db_session)
+        await db_session.execute(
+            update(Website.__table__)
+            .where(Website.__table__.c.id == test_website_with_style.id)
+            .values(is_active=False)
+        )
+        await db_session.commit()
+
+        await rebuild_popular_lists(db_session)
+        assert not await redis_client.exists(
+            popular_key(), popular_key("style", test_style.id)
+        )
+        assert await redis_client.smembers(KEYS_KEY) == {popular_key().encode()}
+
+
+class TestPopularEndpoints:
+    async def test_falls_back_to_sql_until_built(
+        self, client: AsyncClient, db_session: AsyncSession, test_websites: list[Website]
+    ) -> None:
+        await set_views(db_session, {"test-site-0": 50})
+        response = await client.get("/api/v1/websites/popular", params={"limit": 3})
+        assert slugs(response) == ["test-site-0", "test-site-4", "test-site-3"]
+
+    async def test_reads_the_ranked_list(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Ties rank the newest id first, as in SQL
+        await set_views(db_session, {"test-site-0": 50, "test-site-2": 40})
+        await rebuild_popular_lists(db_session)
+        monkeypatch.setattr(crud_website, "get_popular", unused)
+
+        response = await client.get("/api/v1/websites/popular", params={"limit": 3})
+        assert slugs(response) == ["test-site-0", "test-site-4", "test-site-2"]
+
+    async def test_taxonomy_listing_sorted_by_popularity(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+        test_category: Category,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        await set_views(db_session, {"test-site-1": 99})
+        url = f"/api/v1/categories/{test_category.slug}/websites"
+        params = {"sort": "popular", "size": 2, "page": 2}
+
+        from_sql = await client.get(url, params=params)
+        assert slugs(from_sql) == ["test-site-3", "test-site-2"]
+
+        await rebuild_popular_lists(db_session)
+        monkeypatch.setattr(crud_website, "get_filtered", unused)
+        response = await client.get(url, params={**params, "with_total": False})
+        assert slugs(response) == slugs(from_sql)
+        assert response.json()["next_cursor"] is None
+
+    async def test_popular_sort_rejects_cursor(
+        self, client: AsyncClient, test_category: Category
+    ) -> None:
+        response = await client.get(
+            f"/api/v1/categories/{test_category.slug}/websites",
+            params={"sort": "popular", "cursor": "abc"},
+        )
+        assert response.status_code == 400
+
+
+class TestIncrements:
+    async def test_flushed_views_move_websites_up(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_websites: list[Website],
+        test_category: Category,
+    ) -> None:
+        await rebuild_popular_lists(db_session)
+        await redis_client.hincrby(VIEWS_KEY, "test-site-0", 100)
+        await flush_views(db_session)
+
+        for key in (popular_key(), popular_key("category", test_category.id)):
+            [(member, score)] = await redis_client.zrevrange(key, 0, 0, withscores=True)
+            assert (int(member), score) == (test_websites[0].id, 100)
@@ -1,7 +1,51 @@
+import asyncio
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import listen_for_invalidations
+from app.crud.website import crud_website
+from app.database import ReplicaRouter, get_read_db
+from app.main import app
+from app.models import Category, Collection, Style, Website
+from app.services import suggest
+from app.services.suggest import PrefixIndex, normalize
+from tests.conftest import async_session_test, engine
+
 
-from app.models import Website
+@contextmanager
+def on_postgres(db: AsyncSession) -> Iterator[None]:
+    """Make ``db`` report the PostgreSQL dialect, so CRUD builds its SQL."""
+    bind = SimpleNamespace(dialect=asyncpg.dialect())
+    with patch.object(db, "get_bind", return_value=bind):
+        yield
+
+
+async def postgres_search(
+    db: AsyncSession, query: str, pages: list[tuple[list, int]]
+) -> list[str]:
+    """Run ``crud_website.search`` as if on PostgreSQL; returns the page SQL."""
+    with (
+        on_postgres(db),
+        patch.object(crud_website, "_page", AsyncMock(side_effect=pages)) as page,
+    ):
+        await crud_website.search(db, query)
+    return [
+        str(
+            call.args[1]
+            .order_by(*call.kwargs["order_by"])
+            .compile(dialect=asyncpg.dialect())
+        )
+        for call in page.await_args_list
+    ]
 
 
 class TestSearch:
@@ -43,6 +87,20 @@ class TestSearch:
         assert data["total"] == 5
         assert data["pages"] == 3
 
+    async def test_search_facets(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        test_website_with_style: Website,
+    ) -> None:
+        response = await client.get("/api/v1/search?q=styled&facets=true")
+        facets = response.json()["facets"]
+        assert facets["styles"] == [{"slug": "dark-mode", "title": "Dark Mode", "count": 1}]
+        assert facets["categories"] == [{"slug": "minimal", "title": "Minimal", "count": 1}]
+
+        response = await client.get("/api/v1/search?q=site&facets=true")
+        assert response.json()["facets"]["platforms"][0]["count"] == 6
+
     async def test_search_case_insensitive(
         self, client: AsyncClient, test_website: Website
     ) -> None:
@@ -50,3 +108,182 @@ class TestSearch:
         assert response.status_code == 200
         data = response.json()
         assert data["total"] >= 1
+
+
+class TestSearchOnReadSession:
+    """The real read path: a ``ReadSession`` with no bind between statements."""
+
+    @pytest.fixture(autouse=True)
+    def real_read_db(self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+        app.dependency_overrides.pop(get_read_db)
+        monkeypatch.setattr("app.database.read_router", ReplicaRouter(engine, [], 30))
+
+    async def test_search(self, client: AsyncClient, test_websites: list[Website]) -> None:
+        response = await client.get("/api/v1/search?q=site")
+        assert response.status_code == 200
+        assert response.json()["total"] == 5
+
+    async def test_search_facets(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        response = await client.get("/api/v1/search?q=site&facets=true")
+        assert response.status_code == 200
+        assert response.json()["facets"]["platforms"][0]["count"] == 5
+
+
+class TestPostgresSearch:
+    async def test_ranks_full_text_matches(self, db_session: AsyncSession) -> None:
+        [sql] = await postgres_search(db_session, "landing page", [([object()], 1)])
+        assert "websites.search_vector @@ websearch_to_tsquery(" in sql
+        assert "ORDER BY ts_rank(websites.search_vector, websearch_to_tsquery(" in sql
+
+    async def test_falls_back_to_trigrams_without_matches(
+        self, db_session: AsyncSession
+    ) -> None:
+        fulltext, trigram = await postgres_search(
+            db_session, "portfollio", [([], 0), ([object()], 1)]
+        )
+        assert "websearch_to_tsquery" in fulltext
+        assert "websites.title %> " in trigram
+        assert "ORDER BY word_similarity(" in trigram
+
+    async def test_short_queries_skip_full_text(self, db_session: AsyncSession) -> None:
+        [sql] = await postgres_search(db_session, "ab", [([], 0)])
+        assert "websearch_to_tsquery" not in sql
+        assert "websites.title %> " in sql
+
+    async def test_facets_use_the_same_fallback(self, db_session: AsyncSession) -> None:
+        with (
+            on_postgres(db_session),
+            patch.object(db_session, "scalar", AsyncMock(return_value=False)),
+        ):
+            [match, _] = await crud_website.search_filters(db_session, "portfollio")
+        assert "websites.title %> " in str(match.compile(dialect=asyncpg.dialect()))
+
+
+class TestSuggest:
+    async def test_suggests_titles_and_taxonomy_names(
+        self,
+        client: AsyncClient,
+        test_website_with_style: Website,
+        test_website_with_collection: Website,
+    ) -> None:
+        response = await client.get("/api/v1/search/suggest?q=sty")
+        assert response.status_code == 200
+        assert response.json() == {
+            "websites": [{"title": "Styled Site", "slug": "styled-site"}],
+            "categories": [],
+            "styles": [],
+            "collections": [],
+        }
+
+        data = (await client.get("/api/v1/search/suggest?q=MIN")).json()
+        assert data["categories"] == [{"title": "Minimal", "slug": "minimal"}]
+
+        # Any word of a name is a starting point
+        data = (await client.get("/api/v1/search/suggest?q=anim")).json()
+        assert data["collections"] == [
+            {"title": "GSAP Animations", "slug": "gsap-animations"}
+        ]
+        data = (await client.get("/api/v1/search/suggest?q=site")).json()
+        assert {w["slug"] for w in data["websites"]} == {"styled-site", "collection-site"}
+
+    async def test_most_viewed_first_within_limit(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        data = (await client.get("/api/v1/search/suggest?q=test&limit=2")).json()
+        assert [w["slug"] for w in data["websites"]] == ["test-site-4", "test-site-3"]
+
+    async def test_hides_empty_taxonomies(
+        self, client: AsyncClient, test_style: Style, test_collection: Collection
+    ) -> None:
+        data = (await client.get("/api/v1/search/suggest?q=dark")).json()
+        assert data["styles"] == []
+
+    async def test_admin_write_refreshes_index(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_category: Category,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def in_test_session(func, *args):
+            async with async_session_test() as session:
+                return await func(session, *args)
+
+        monkeypatch.setattr(suggest, "run_in_session", in_test_session)
+        listener = asyncio.create_task(listen_for_invalidations())
+        indexer = asyncio.create_task(suggest.run_suggest_indexer())
+        await asyncio.sleep(0.05)
+        try:
+            data = (await client.get("/api/v1/search/suggest?q=portf")).json()
+            assert data["websites"] == []
+
+            await client.post(
+                "/api/v1/websites",
+                json={"slug": "portfolio", "title": "Portfolio", "category_ids": [test_category.id]},
+                headers=admin_headers,
+            )
+            await asyncio.sleep(0.05)
+
+            data = (await client.get("/api/v1/search/suggest?q=portf")).json()
+            assert data["websites"] == [{"title": "Portfolio", "slug": "portfolio"}]
+        finally:
+            listener.cancel()
+            indexer.cancel()
+
+    async def test_lookups_never_rebuild_inline(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        await client.get("/api/v1/search/suggest?q=test")
+
+        async def unused(db):
+            raise AssertionError("lookup rebuilt the index")
+
+        monkeypatch.setattr(suggest.SuggestIndex, "load", unused)
+        suggest._on_invalidate(["websites"])
+        response = await client.get("/api/v1/search/suggest?q=test&limit=1")
+        assert response.json()["websites"] == [{"title": "Test Site 4", "slug": "test-site-4"}]
+
+
+class TestPrefixIndex:
+    def test_matches_brute_force(self) -> None:
+        rng = random.Random(7)
+        words = ["alpha", "alps", "beta", "bet", "Émile", "emu", "gamma", "gam"]
+        items = [
+            (" ".join(rng.sample(words, 3)), f"site-{i}", rng.randrange(100))
+            for i in range(300)
+        ]
+        index = PrefixIndex(items)
+
+        for prefix in ["a", "al", "alp", "be", "bet ", "emi", "e", "gamma b", "z"]:
+            matches = sorted(
+                (-popularity, title, slug)
+                for title, slug, popularity in items
+                if any(
+                    key.startswith(normalize(prefix))
+                    for key in (
+                        " ".join(normalize(title).split()[i:])
+                        for i in range(3)
+                    )
+                )
+            )
+            expected = [slug for _, _, slug in matches[:5]]
+            assert [s.slug for s in index.lookup(prefix, 5)] == expected, prefix
+
+    def test_lookup_stays_fast_on_a_large_catalog(self) -> None:
+        rng = random.Random(1)
+        words = [f"word{i}" for i in range(500)]
+        index = PrefixIndex(
+            (" ".join(rng.sample(words, 4)), f"site-{i}", rng.randrange(10_000))
+            for i in range(20_000)
+        )
+        start = time.perf_counter()
+        for prefix in ("w", "wo", "word1", "word12", "word123"):
+            for _ in range(100):
+                index.lookup(prefix, 10)
+        # Generous bound for slow CI machines; typically tens of microseconds
+        assert (time.perf_counter() - start) / 500 < 0.005
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from fakeredis.aioredis import FakeRedis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Website
+from app.services.trending import (
+    _today,
+    day_key,
+    refresh_trending,
+    top_scores,
+    trending_scores,
+)
+from app.services.view_counter import VIEWS_KEY, flush_views
+
+
+def slugs(response) -> list[str]:
+    return [item["slug"] for item in response.json()]
+
+
+class TestScores:
+    def test_decays_by_half_life(self) -> None:
+        buckets = [
+            (np.array([1, 2]), np.array([4.0, 1.0])),  # today
+            (np.array([], dtype=np.int64), np.array([])),
+            (np.array([3, 1]), np.array([8.0, 4.0])),  # two days ago
+        ]
+        ids, scores = trending_scores(buckets, half_life_days=2.0)
+        assert ids.tolist() == [1, 2, 3]
+        assert scores.tolist() == [6.0, 1.0, 4.0]
+
+    def test_matches_a_loop_over_days(self) -> None:
+        rng = np.random.default_rng(3)
+        buckets = []
+        for _ in range(7):
+            ids = rng.choice(500, size=200, replace=False)
+            buckets.append((ids, rng.integers(1, 50, ids.size).astype(float)))
+
+        ids, scores = trending_scores(buckets, half_life_days=3.0)
+        expected: dict[int, float] = {}
+        for age, (bucket_ids, counts) in enumerate(buckets):
+            for website_id, count in zip(bucket_ids.tolist(), counts.tolist()):
+                expected[website_id] = expected.get(website_id, 0.0) + count * 0.5 ** (age / 3)
+        assert dict(zip(ids.tolist(), scores.tolist())) == pytest.approx(expected)
+
+    def test_top_scores_break_ties_by_newest_id(self) -> None:
+        ids = np.array([1, 2, 3, 4, 5])
+        scores = np.array([3.0, 9.0, 3.0, 1.0, 3.0])
+        best, _ = top_scores(ids, scores, 3)
+        assert best.tolist() == [2, 5, 3]
+
+
+class TestTrending:
+    async def test_flushes_into_todays_bucket(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_websites: list[Website],
+    ) -> None:
+        await redis_client.hincrby(VIEWS_KEY, "test-site-2", 3)
+        await flush_views(db_session)
+
+        key = day_key(_today())
+        assert await redis_client.hgetall(key) == {
+            str(test_websites[2].id).encode(): b"3"
+        }
+        assert await redis_client.ttl(key) > 14 * 86400
+
+    async def test_recent_views_outrank_lifetime_views(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_websites: list[Website],
+    ) -> None:
+        # Before any scores exist, trending serves the popular list
+        response = await client.get("/api/v1/websites/trending", params={"limit": 2})
+        assert slugs(response) == ["test-site-4", "test-site-3"]
+
+        today = _today()
+        by_slug = {website.slug: website.id for website in test_websites}
+        await redis_client.hset(day_key(today), mapping={by_slug["test-site-0"]: 5})
+        await redis_client.hset(
+            day_key(today - timedelta(days=9)), mapping={by_slug["test-site-1"]: 30}
+        )
+        assert await refresh_trending(redis_client) == 2
+
+        response = await client.get("/api/v1/websites/trending?limit=3")
+        assert slugs(response) == ["test-site-0", "test-site-1"]
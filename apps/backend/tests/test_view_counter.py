@@ -0,0 +1,109 @@
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import redis.asyncio as redis
+from fakeredis.aioredis import FakeRedis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Website
+from app.services import view_counter
+from app.services.view_counter import VIEWS_KEY, flush_views, record_view
+
+
+@pytest.fixture(autouse=True)
+def clear_local_views() -> Iterator[None]:
+    view_counter._local_views.clear()
+    yield
+    view_counter._local_views.clear()
+
+
+class TestBufferedViews:
+    async def test_views_wait_in_redis_until_flushed(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        redis_client: FakeRedis,
+        test_website: Website,
+    ) -> None:
+        for _ in range(3):
+            await client.get(f"/api/v1/websites/{test_website.slug}")
+
+        await db_session.refresh(test_website)
+        assert test_website.view_count == 0
+        assert await redis_client.hget(VIEWS_KEY, test_website.slug) == b"3"
+
+        assert await flush_views(db_session) == 3
+        await db_session.refresh(test_website)
+        assert test_website.view_count == 3
+        assert not await redis_client.exists(VIEWS_KEY)
+
+    async def test_revalidations_count_but_misses_do_not(
+        self, client: AsyncClient, redis_client: FakeRedis, test_website: Website
+    ) -> None:
+        url = f"/api/v1/websites/{test_website.slug}"
+        etag = (await client.get(url)).headers["etag"]
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        await client.get("/api/v1/websites/no-such-site")
+
+        assert await redis_client.hgetall(VIEWS_KEY) == {test_website.slug.encode(): b"2"}
+
+    async def test_flush_updates_every_slug_in_one_statement(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+    ) -> None:
+        before = {w.slug: (w.view_count, w.updated_at) for w in test_websites}
+        for i, website in enumerate(test_websites):
+            for _ in range(i + 1):
+                await client.get(f"/api/v1/websites/{website.slug}")
+
+        with patch.object(
+            view_counter.crud_website,
+            "add_views",
+            wraps=view_counter.crud_website.add_views,
+        ) as add_views:
+            assert await flush_views(db_session) == 15
+        add_views.assert_awaited_once()
+
+        for i, website in enumerate(test_websites):
+            await db_session.refresh(website)
+            view_count, updated_at = before[website.slug]
+            assert website.view_count == view_count + i + 1
+            # A view is not an edit
+            assert website.updated_at == updated_at
+
+    async def test_falls_back_to_local_buffer_without_redis(
+        self, db_session: AsyncSession, test_website: Website
+    ) -> None:
+        down = AsyncMock(side_effect=redis.ConnectionError)
+        with patch("app.services.view_counter.get_redis", down):
+            await record_view(test_website.slug)
+            await record_view(test_website.slug)
+            assert await flush_views(db_session) == 2
+
+        await db_session.refresh(test_website)
+        assert test_website.view_count == 2
+
+    async def test_failed_flush_keeps_counts_for_retry(
+        self, db_session: AsyncSession, redis_client: FakeRedis, test_website: Website
+    ) -> None:
+        await redis_client.hincrby(VIEWS_KEY, test_website.slug, 4)
+
+        with (
+            patch("app.services.view_counter.get_redis", AsyncMock(return_value=redis_client)),
+            patch.object(
+                view_counter.crud_website, "add_views", AsyncMock(side_effect=RuntimeError)
+            ),
+            pytest.raises(RuntimeError),
+        ):
+            await flush_views(db_session)
+
+        assert view_counter._local_views[test_website.slug] == 4
+        with patch("app.services.view_counter.get_redis", AsyncMock(return_value=redis_client)):
+            assert await flush_views(db_session) == 4
+        await db_session.refresh(test_website)
+        assert test_website.view_count == 4
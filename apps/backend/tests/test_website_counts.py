@@ -0,0 +1,114 @@
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Category, Platform, Style, Website, reconcile_website_counts
+
+
+async def counts(db: AsyncSession, *objects) -> list[int]:
+    for obj in objects:
+        await db.refresh(obj)
+    return [obj.website_count for obj in objects]
+
+
+class TestMaintainedCounts:
+    async def test_counts_websites_added_through_the_orm(
+        self,
+        db_session: AsyncSession,
+        test_category: Category,
+        test_platform: Platform,
+        test_websites: list[Website],
+    ) -> None:
+        assert await counts(db_session, test_category, test_platform) == [5, 5]
+
+    async def test_admin_create_update_delete_keep_counts_exact(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        admin_headers: dict[str, str],
+        test_category: Category,
+        test_style: Style,
+        test_platform: Platform,
+    ) -> None:
+        await client.post(
+            "/api/v1/websites",
+            json={
+                "slug": "counted",
+                "title": "Counted",
+                "platform_id": test_platform.id,
+                "category_ids": [test_category.id],
+            },
+            headers=admin_headers,
+        )
+        assert await counts(db_session, test_category, test_style, test_platform) == [1, 0, 1]
+
+        # Move from the category to the style
+        await client.put(
+            "/api/v1/websites/counted",
+            json={"category_ids": [], "style_ids": [test_style.id]},
+            headers=admin_headers,
+        )
+        assert await counts(db_session, test_category, test_style, test_platform) == [0, 1, 1]
+
+        # Inactive websites do not count anywhere
+        await client.put(
+            "/api/v1/websites/counted", json={"is_active": False}, headers=admin_headers
+        )
+        assert await counts(db_session, test_style, test_platform) == [0, 0]
+
+        await client.put(
+            "/api/v1/websites/counted", json={"is_active": True}, headers=admin_headers
+        )
+        assert await counts(db_session, test_style, test_platform) == [1, 1]
+
+        await client.delete("/api/v1/websites/counted", headers=admin_headers)
+        assert await counts(db_session, test_category, test_style, test_platform) == [0, 0, 0]
+
+
+class TestReconcile:
+    async def test_reconcile_repairs_drift(
+        self,
+        db_session: AsyncSession,
+        test_category: Category,
+        test_platform: Platform,
+        test_websites: list[Website],
+    ) -> None:
+        await db_session.execute(
+            update(Category.__table__).values(website_count=42)
+        )
+        await db_session.execute(
+            update(Website.__table__)
+            .where(Website.__table__.c.slug == "test-site-0")
+            .values(is_active=False)
+        )
+
+        corrected = await reconcile_website_counts(db_session)
+        await db_session.commit()
+
+        assert corrected == {"categories": 1, "styles": 0, "collections": 0, "platforms": 1}
+        assert await counts(db_session, test_category, test_platform) == [4, 4]
+        assert await reconcile_website_counts(db_session) == {
+            "categories": 0, "styles": 0, "collections": 0, "platforms": 0,
+        }
+
+
+class TestTotalsFromCounters:
+    async def test_taxonomy_listing_total_reads_the_counter(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_category: Category,
+        test_websites: list[Website],
+    ) -> None:
+        await db_session.execute(
+            update(Category.__table__).values(website_count=7)
+        )
+        await db_session.commit()
+
+        for url in (
+            f"/api/v1/categories/{test_category.slug}/websites?size=2",
+            f"/api/v1/websites?category={test_category.slug}&size=2",
+        ):
+            data = (await client.get(url)).json()
+            assert data["total"] == 7
+            assert data["pages"] == 4
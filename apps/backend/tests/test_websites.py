@@ -1,7 +1,14 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Category, Platform, Website
+from app.api.v1.endpoints import websites as websites_endpoints
+from app.models import Category, Platform, Style, Website, website_categories
+from app.services.view_counter import flush_views
+from tests.conftest import capture_sql
 
 
 class TestWebsitesList:
@@ -43,6 +50,74 @@ class TestWebsitesList:
         assert len(data["items"]) == 2
         assert data["page"] == 2
 
+    async def test_filtered_page_and_total_in_one_query(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        with capture_sql() as statements:
+            response = await client.get(
+                "/api/v1/websites", params={"category": "minimal", "featured": False, "size": 2}
+            )
+        assert response.json()["total"] == 3
+        [(sql, _)] = statements
+        assert "OVER ()" in sql
+
+    async def test_unfiltered_total_counted_apart(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        with capture_sql() as statements:
+            response = await client.get("/api/v1/websites?page=2&size=2")
+        assert response.json()["total"] == 5
+        # A window count would read the whole catalog before LIMIT
+        assert len(statements) == 2
+        assert not any("OVER ()" in sql for sql, _ in statements)
+
+    async def test_list_websites_total_past_last_page(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        response = await client.get("/api/v1/websites?page=9&size=2")
+        data = response.json()
+        assert data["items"] == []
+        assert data["total"] == 5
+
+    async def test_list_websites_without_total(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        response = await client.get("/api/v1/websites?size=2&with_total=false")
+        data = response.json()
+        assert len(data["items"]) == 2
+        assert data["total"] is None
+        assert data["pages"] is None
+        assert data["next_cursor"] is not None
+
+    async def test_list_websites_cursor_walks_every_row_once(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        slugs: list[str] = []
+        params = {"size": 2}
+        while True:
+            response = await client.get("/api/v1/websites", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            slugs += [item["slug"] for item in data["items"]]
+            if data["next_cursor"] is None:
+                break
+            params["cursor"] = data["next_cursor"]
+        assert sorted(slugs) == sorted(w.slug for w in test_websites)
+
+    async def test_list_websites_cursor_matches_page_2(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        first = (await client.get("/api/v1/websites?size=2")).json()
+        by_cursor = await client.get(
+            "/api/v1/websites", params={"size": 2, "cursor": first["next_cursor"]}
+        )
+        by_page = await client.get("/api/v1/websites?page=2&size=2")
+        assert by_cursor.json()["items"] == by_page.json()["items"]
+
+    async def test_list_websites_invalid_cursor(self, client: AsyncClient) -> None:
+        response = await client.get("/api/v1/websites?cursor=not-a-cursor")
+        assert response.status_code == 400
+
     async def test_list_websites_filter_by_category(
         self, client: AsyncClient, test_websites: list[Website], test_category: Category
     ) -> None:
@@ -52,6 +127,165 @@ class TestWebsitesList:
         assert len(data["items"]) == 5
 
 
+def slugs(response) -> list[str]:
+    return [item["slug"] for item in response.json()["items"]]
+
+
+class TestWebsiteFilters:
+    async def test_combines_taxonomies_with_and(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        test_website_with_style: Website,
+        test_category: Category,
+        test_style: Style,
+    ) -> None:
+        response = await client.get(
+            "/api/v1/websites",
+            params={"category": test_category.slug, "style": test_style.slug},
+        )
+        assert slugs(response) == ["styled-site"]
+        assert response.json()["total"] == 1
+
+    async def test_several_values_match_any_or_all(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+        test_category: Category,
+    ) -> None:
+        bold = Category(slug="bold", title="Bold")
+        db_session.add_all([bold, Website(slug="only-bold", title="Only Bold", categories=[bold])])
+        await db_session.flush()
+        await db_session.execute(
+            insert(website_categories).values(website_id=test_websites[0].id, category_id=bold.id)
+        )
+        await db_session.commit()
+
+        params = {"category": [test_category.slug, bold.slug], "size": 100}
+        response = await client.get("/api/v1/websites", params=params)
+        assert response.json()["total"] == 6
+
+        response = await client.get("/api/v1/websites", params={**params, "match": "all"})
+        assert slugs(response) == ["test-site-0"]
+
+    async def test_platform_featured_and_date_range(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_websites: list[Website],
+        test_platform: Platform,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        for i, website in enumerate(test_websites):
+            await db_session.execute(
+                update(Website.__table__)
+                .where(Website.__table__.c.id == website.id)
+                .values(created_at=now - timedelta(days=i))
+            )
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/v1/websites", params={"platform": [test_platform.slug, "other"], "featured": True}
+        )
+        assert sorted(slugs(response)) == ["test-site-0", "test-site-1"]
+
+        response = await client.get(
+            "/api/v1/websites",
+            params={
+                "created_after": (now - timedelta(days=3, hours=1)).isoformat(),
+                "created_before": (now - timedelta(hours=1)).isoformat(),
+            },
+        )
+        assert slugs(response) == ["test-site-1", "test-site-2", "test-site-3"]
+
+    async def test_sort_orders(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        response = await client.get("/api/v1/websites?sort=popular&size=2")
+        assert slugs(response) == ["test-site-4", "test-site-3"]
+        assert response.json()["next_cursor"] is None
+
+        response = await client.get("/api/v1/websites?sort=alpha&page=2&size=2")
+        assert slugs(response) == ["test-site-2", "test-site-3"]
+        assert response.json()["total"] == 5
+
+    async def test_cursor_needs_newest_first(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        first = (await client.get("/api/v1/websites?size=2")).json()
+        response = await client.get(
+            "/api/v1/websites", params={"sort": "alpha", "cursor": first["next_cursor"]}
+        )
+        assert response.status_code == 400
+
+        response = await client.get("/api/v1/websites?sort=random")
+        assert response.status_code == 422
+
+    async def test_one_statement_per_combination(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        test_website_with_style: Website,
+        test_style: Style,
+    ) -> None:
+        with capture_sql() as statements:
+            await client.get(
+                "/api/v1/websites",
+                params={"category": "minimal", "style": test_style.slug, "featured": False},
+            )
+        assert len(statements) == 1
+
+
+class TestWebsiteFacets:
+    async def test_facets_count_the_whole_result_set(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        test_website_with_style: Website,
+        test_website_with_collection: Website,
+    ) -> None:
+        response = await client.get("/api/v1/websites?size=2")
+        assert response.json()["facets"] is None
+
+        response = await client.get("/api/v1/websites?size=2&facets=true")
+        assert response.status_code == 200
+        assert response.json()["facets"] == {
+            "categories": [{"slug": "minimal", "title": "Minimal", "count": 7}],
+            "styles": [{"slug": "dark-mode", "title": "Dark Mode", "count": 1}],
+            "collections": [
+                {"slug": "gsap-animations", "title": "GSAP Animations", "count": 1}
+            ],
+            "platforms": [{"slug": "webflow", "title": "Webflow", "count": 7}],
+        }
+
+    async def test_facets_follow_the_filter(
+        self,
+        client: AsyncClient,
+        test_websites: list[Website],
+        test_website_with_style: Website,
+        test_style: Style,
+    ) -> None:
+        response = await client.get(f"/api/v1/websites?style={test_style.slug}&facets=true")
+        facets = response.json()["facets"]
+        assert facets["categories"] == [{"slug": "minimal", "title": "Minimal", "count": 1}]
+        assert facets["collections"] == []
+
+        response = await client.get("/api/v1/websites?style=unknown&facets=true")
+        assert response.json()["facets"]["platforms"] == []
+
+    async def test_facets_take_one_query_shared_across_pages(
+        self, client: AsyncClient, test_websites: list[Website]
+    ) -> None:
+        with capture_sql() as statements:
+            await client.get("/api/v1/websites?size=2&facets=true")
+            assert len(statements) == 3
+            response = await client.get("/api/v1/websites?page=2&size=2&facets=true")
+            # Page and total only; the facets come from cache
+            assert len(statements) == 5
+        assert response.json()["facets"]["platforms"][0]["count"] == 5
+
+
 class TestWebsiteDetail:
     async def test_get_website_by_slug(
         self, client: AsyncClient, test_website: Website
@@ -74,6 +308,7 @@ class TestWebsiteDetail:
         initial_count = test_website.view_count
 
         await client.get(f"/api/v1/websites/{test_website.slug}")
+        await flush_views(db_session)
         await db_session.refresh(test_website)
 
         assert test_website.view_count == initial_count + 1
@@ -206,6 +441,81 @@ class TestWebsiteUpdate:
         assert data["title"] == "Updated Title"
         assert data["description"] == "Updated description"
 
+    async def test_commits_before_invalidating(
+        self,
+        client: AsyncClient,
+        admin_headers: dict[str, str],
+        test_website: Website,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        calls = []
+        commit = AsyncSession.commit
+
+        async def record_commit(self) -> None:
+            calls.append("commit")
+            await commit(self)
+
+        async def record_invalidate(tags) -> None:
+            calls.append("invalidate")
+
+        monkeypatch.setattr(AsyncSession, "commit", record_commit)
+        monkeypatch.setattr(websites_endpoints, "invalidate_tags", record_invalidate)
+
+        await client.put(
+            f"/api/v1/websites/{test_website.slug}",
+            json={"title": "Committed"},
+            headers=admin_headers,
+        )
+        # A read racing the bump would otherwise cache the old row
+        assert calls.index("commit") < calls.index("invalidate")
+
+    async def test_moving_platforms_refreshes_both_listings(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        admin_headers: dict[str, str],
+        test_website: Website,
+    ) -> None:
+        framer = Platform(slug="framer", title="Framer", website_count=0, is_active=True)
+        db_session.add(framer)
+        await db_session.commit()
+        response = await client.get("/api/v1/websites", params={"platform": "framer"})
+        assert response.json()["total"] == 0
+
+        response = await client.put(
+            f"/api/v1/websites/{test_website.slug}",
+            json={"platform_id": framer.id},
+            headers=admin_headers,
+        )
+        assert response.json()["platform"]["slug"] == "framer"
+
+        response = await client.get("/api/v1/websites", params={"platform": "framer"})
+        assert response.json()["total"] == 1
+        response = await client.get("/api/v1/websites", params={"platform": "webflow"})
+        assert response.json()["total"] == 0
+
+    async def test_assigning_a_platform_refreshes_platform_counts(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        admin_headers: dict[str, str],
+        test_platform: Platform,
+    ) -> None:
+        db_session.add(Website(slug="unplatformed", title="Unplatformed"))
+        await db_session.commit()
+        response = await client.get("/api/v1/platforms")
+        assert response.json()[0]["website_count"] == 0
+
+        response = await client.put(
+            "/api/v1/websites/unplatformed",
+            json={"platform_id": test_platform.id},
+            headers=admin_headers,
+        )
+        assert response.json()["platform"]["slug"] == "webflow"
+
+        response = await client.get("/api/v1/platforms")
+        assert response.json()[0]["website_count"] == 1
+
     async def test_update_website_unauthenticated(
         self, client: AsyncClient, test_website: Website
     ) -> None:
@@ -17,7 +17,7 @@ export const useWebsitesStore = defineStore('websites', () => {
     try {
       const response = await fetchWebsites(filters)
       websites.value = response.items
-      meta.value = { page: response.page, size: response.size, total: response.total, pages: response.pages }
+      meta.value = { page: response.page, size: response.size, total: response.total ?? 0, pages: response.pages ?? 0 }
     } catch (e: any) {
       error.value = e?.message || 'Failed to load websites'
     } finally {
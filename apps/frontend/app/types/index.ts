@@ -72,8 +72,23 @@ export interface PaginatedResponse<T> {
   items: T[]
   page: number
   size: number
-  total: number
-  pages: number
+  total: number | null
+  pages: number | null
+  next_cursor: string | null
+  facets?: Facets | null
+}
+
+export interface FacetCount {
+  slug: string
+  title: string
+  count: number
+}
+
+export interface Facets {
+  categories: FacetCount[]
+  styles: FacetCount[]
+  collections: FacetCount[]
+  platforms: FacetCount[]
 }
 
 export interface Filters {